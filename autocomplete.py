@@ -0,0 +1,69 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, List
+
+
+class AutocompleteEntry(ttk.Entry):
+    """Entry that lists the completions of its text below itself while typing.
+
+    ``complete`` gets the current text and returns the names to offer; it is
+    called on every key press, so it should answer from memory.
+    """
+
+    def __init__(self, master, complete: Callable[[str], List[str]], **kwargs) -> None:
+        super().__init__(master, **kwargs)
+        self.complete = complete
+        self.listbox = tk.Listbox(self.winfo_toplevel(), height=6, exportselection=False)
+        self.listbox.bind("<ButtonRelease-1>", self.select)
+        self.listbox.bind("<Return>", self.select)
+        self.listbox.bind("<Escape>", self.hide)
+        self.listbox.bind("<FocusOut>", self.focus_out)
+        self.bind("<KeyRelease>", self.update_list)
+        self.bind("<Down>", self.focus_list)
+        self.bind("<Escape>", self.hide)
+        self.bind("<FocusOut>", self.focus_out)
+
+    def update_list(self, event=None) -> None:
+        if event is not None and event.keysym in ("Down", "Up", "Return", "Escape", "Tab"):
+            return
+        text = self.get()
+        names = [i for i in self.complete(text) if i != text] if text else []
+        if not names:
+            self.hide()
+            return
+        self.listbox.delete(0, tk.END)
+        for i in names:
+            self.listbox.insert(tk.END, i)
+        self.listbox.configure(height=min(len(names), 6))
+        self.listbox.place(in_=self, x=0, rely=1.0, relwidth=1.0)
+        self.listbox.lift()
+
+    def focus_list(self, event=None) -> str:
+        if self.listbox.winfo_ismapped():
+            self.listbox.focus_set()
+            self.listbox.selection_clear(0, tk.END)
+            self.listbox.selection_set(0)
+            self.listbox.activate(0)
+        return "break"
+
+    def select(self, event=None) -> str:
+        selection = self.listbox.curselection()
+        if selection:
+            self.delete(0, tk.END)
+            self.insert(0, self.listbox.get(selection[0]))
+            self.icursor(tk.END)
+        self.hide()
+        self.focus_set()
+        return "break"
+
+    def focus_out(self, event=None) -> None:
+        # Clicking the list moves the focus there first; keep it open for the click.
+        if self.focus_get() not in (self, self.listbox):
+            self.after(100, self.hide_unless_focused)
+
+    def hide_unless_focused(self) -> None:
+        if self.focus_get() not in (self, self.listbox):
+            self.hide()
+
+    def hide(self, event=None) -> None:
+        self.listbox.place_forget()
@@ -0,0 +1,76 @@
+from typing import Any, Dict, Optional, Type
+
+from franz.openrdf.repository import Repository
+from franz.openrdf.sail import AllegroGraphServer
+
+import settings
+from memory_store import MemoryRepository, PersistentRepository
+
+
+class Backend:
+    """Storage behind database.py.
+
+    ``open`` returns a repository whose ``getConnection()`` gives connections
+    with the AllegroGraph client API: SPARQL queries and updates, ``addFile``
+    for bulk loads and ``size``. Inserts, deletes, renames and clears are all
+    SPARQL updates in database.py, so every backend supports them.
+    """
+
+    def open(self) -> Any:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def with_timeout(self, query: str, timeout: float) -> str:
+        """Ask the store to give up on ``query`` after ``timeout`` seconds, where it can."""
+        return query
+
+
+class AllegroGraphBackend(Backend):
+    def with_timeout(self, query: str, timeout: float) -> str:
+        return "PREFIX franzOption_queryTimeout: <franz:%d>\n%s" % (max(1, round(timeout)), query)
+
+    def open(self) -> Any:
+        server = AllegroGraphServer(
+            host=settings.HOST,
+            port=settings.PORT,
+            user=settings.USER,
+            password=settings.PASSWORD,
+        )
+        catalog = server.openCatalog(settings.CATALOG_NAME)
+        return catalog.getRepository(settings.REPOSITORY_NAME, Repository.ACCESS)
+
+
+class EmbeddedBackend(Backend):
+    """In-process rdflib store, persisted to ``path`` when one is given."""
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self.repository: Optional[MemoryRepository] = None
+
+    def open(self) -> Any:
+        if self.path:
+            self.repository = PersistentRepository(self.path, compact_every=settings.EMBEDDED_COMPACT_EVERY)
+        else:
+            self.repository = MemoryRepository()
+        return self.repository
+
+    def close(self) -> None:
+        if isinstance(self.repository, PersistentRepository):
+            self.repository.compact()
+
+
+BACKENDS: Dict[str, Type[Backend]] = {
+    "allegrograph": AllegroGraphBackend,
+    "embedded": EmbeddedBackend,
+}
+
+
+def create_backend(name: Optional[str] = None) -> Backend:
+    name = name or settings.BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name!r}, expected one of {', '.join(BACKENDS)}.")
+    if name == "embedded":
+        return EmbeddedBackend(settings.EMBEDDED_STORE_PATH)
+    return BACKENDS[name]()
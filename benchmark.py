@@ -0,0 +1,283 @@
+"""Benchmarks for database.py and the gui.py refresh paths.
+
+Runs against the embedded backend without persistence instead of
+AllegroGraph, filled with a synthetic ontology shaped like lab2.rdf:
+
+    python benchmark.py --sizes 1000 100000 1000000 --output results.json
+    python benchmark.py --compare results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from rdflib import Graph, Literal, Namespace
+from rdflib.namespace import OWL, RDF, RDFS, XSD
+
+import settings
+
+settings.BACKEND = "embedded"
+settings.EMBEDDED_STORE_PATH = None
+
+import database  # noqa: E402
+import gui  # noqa: E402
+
+repository = database.get_repository()
+
+
+DEFAULT_SIZES = [1000, 100000]
+
+ROOT_CLASS = "Динозавры"
+DIET_CLASSES = ["Хищники", "Травоядные", "Всеядные"]
+DATA_PROPERTIES = ["вес", "возраст", "высота"]
+OBJECT_PROPERTIES = ["динозавры_как_пища", "спаривание"]
+
+
+class Ontology(NamedTuple):
+    graph: Graph
+    species: List[str]
+    individuals: List[str]
+
+
+def generate_ontology(size: int, seed: int = 0) -> Ontology:
+    """Build a graph of about ``size`` triples modelled on lab2.rdf."""
+    base = Namespace(settings.BASE_IRI)
+    rng = random.Random(seed)
+    graph = Graph()
+    count = 0
+
+    def add(subject, relation, object) -> None:
+        nonlocal count
+        graph.add((subject, relation, object))
+        count += 1
+
+    add(base[ROOT_CLASS], RDF.type, OWL.Class)
+    for i in DIET_CLASSES:
+        add(base[i], RDF.type, OWL.Class)
+        add(base[i], RDFS.subClassOf, base[ROOT_CLASS])
+
+    species = [f"Вид_{i}" for i in range(max(10, size // 1000))]
+    for i in species:
+        add(base[i], RDF.type, OWL.Class)
+        add(base[i], RDFS.subClassOf, base[rng.choice(DIET_CLASSES)])
+
+    for i in DATA_PROPERTIES:
+        add(base[i], RDF.type, OWL.DatatypeProperty)
+        add(base[i], RDFS.domain, base[ROOT_CLASS])
+        add(base[i], RDFS.range, XSD.decimal)
+    for i in OBJECT_PROPERTIES:
+        add(base[i], RDF.type, OWL.ObjectProperty)
+        add(base[i], RDFS.domain, base[ROOT_CLASS])
+        add(base[i], RDFS.range, base[ROOT_CLASS])
+
+    individuals: List[str] = []
+    while count < size:
+        name = f"Динозавр_{len(individuals)}"
+        individual = base[name]
+        add(individual, RDF.type, OWL.NamedIndividual)
+        add(individual, RDF.type, base[rng.choice(species)])
+        for i in DATA_PROPERTIES:
+            value = Decimal(rng.randint(1, 100000)) / 10
+            add(individual, base[i], Literal(value, datatype=XSD.decimal))
+        if individuals and rng.random() < 0.5:
+            add(individual, base[OBJECT_PROPERTIES[0]], base[rng.choice(individuals)])
+        if individuals and rng.random() < 0.15:
+            add(individual, base[OBJECT_PROPERTIES[1]], base[rng.choice(individuals)])
+        individuals.append(name)
+
+    return Ontology(graph, species, individuals)
+
+
+class Case(NamedTuple):
+    name: str
+    run: Callable[[], Any]
+    mutates: bool = False
+    prepare: Optional[Callable[[], None]] = None
+
+
+def make_cases(ontology: Ontology, workdir: str) -> List[Case]:
+    editor = gui.OntotlogyEditor.__new__(gui.OntotlogyEditor)
+    species = ontology.species[0]
+    individual = ontology.individuals[len(ontology.individuals) // 2]
+    new_triples = [(f"<Новый_{i}>", "rdf:type", "owl:NamedIndividual") for i in range(100)]
+    source = os.path.join(workdir, "source.rdf")
+    imported = "import.rdf"
+
+    def copy_import_file() -> None:
+        shutil.copyfile(source, settings.OWL_FILES_STORAGE + imported)
+
+    return [
+        Case("execute_get_query", lambda: database.execute_get_query()),
+        Case("execute_get_query:classes", lambda: database.execute_get_query(relation="rdf:type", object="owl:Class")),
+        Case("execute_get_query:bound", lambda: database.execute_get_query(subject=f"<{individual}>")),
+        Case("get_objects:NamedIndividual", lambda: database.get_objects("owl:NamedIndividual")),
+        Case("get_properties:ObjectProperty", lambda: database.get_properties("owl:ObjectProperty")),
+        Case("get_properties:DatatypeProperty", lambda: database.get_properties("owl:DatatypeProperty")),
+        Case("ask_typed", lambda: database.ask_typed(species, "owl:Class")),
+        Case("find_typed", lambda: database.find_typed([
+            (species, "owl:Class"), (individual, "owl:NamedIndividual"), (DATA_PROPERTIES[0], "owl:DatatypeProperty"),
+        ])),
+        Case("get_typed_subject", lambda: database.get_typed_subject(individual, "owl:NamedIndividual")),
+        Case("get_individuals_info:50", lambda: database.get_individuals_info(ontology.individuals[:50])),
+        Case("execute_get_individuals_query", lambda: database.execute_get_individuals_query()),
+        Case("execute_get_individuals_query:name", lambda: database.execute_get_individuals_query(name=individual)),
+        Case("execute_get_individuals_query:class", lambda: database.execute_get_individuals_query(class_name=species)),
+        Case("execute_get_individuals_query:class_properties", lambda: database.execute_get_individuals_query(
+            class_name=species, with_properties=True, limit=settings.QUERY_PAGE_SIZE,
+        )),
+        Case("get_name_index", database.get_name_index),
+        Case("name_index.complete", lambda: database.get_name_index().complete("Динозавр_1")),
+        Case("export_statements", lambda: database.export_statements(os.path.join(workdir, "export.nt"))),
+        Case("export_statements:class", lambda: database.export_statements(
+            os.path.join(workdir, "export.nt"), class_name=DIET_CLASSES[0],
+        )),
+        Case("execute_raw_query:page", lambda: database.execute_raw_query(
+            "SELECT ?s ?p ?o WHERE { ?s ?p ?o }", settings.QUERY_PAGE_SIZE, 0,
+        )),
+        Case("gui.update_data_class", editor.update_data_class),
+        Case("gui.update_data_individual", editor.update_data_individual),
+        Case("gui.update_data_object_property", editor.update_data_object_property),
+        Case("gui.update_data_property", editor.update_data_property),
+        Case("gui.update_subclasses", editor.update_subclasses),
+        Case("gui.get_individual_info", lambda: editor.get_individual_info(individual)),
+        Case("gui.load_individuals_info:50", lambda: editor.load_individuals_info(ontology.individuals[:50])),
+        Case("execute_post_query", lambda: database.execute_post_query("<Новый>", "rdf:type", "owl:Class"), True),
+        Case("execute_delete_query", lambda: database.execute_delete_query(
+            f"<{individual}>", "rdf:type", "owl:NamedIndividual",
+        ), True),
+        Case("execute_post_many:100", lambda: database.execute_post_many(new_triples), True),
+        Case("execute_delete_many:100", lambda: database.execute_delete_many(new_triples), True),
+        Case("rename_subject_object", lambda: database.rename_subject_object(individual, "Переименован"), True),
+        Case("rename_relation", lambda: database.rename_relation(DATA_PROPERTIES[0], "масса"), True),
+        Case("rename_many:100", lambda: database.rename_many(
+            {i: f"Переименован_{i}" for i in ontology.individuals[:100]},
+        ), True),
+        Case("delete_class_or_individual", lambda: database.delete_class_or_individual(individual), True),
+        Case("delete_property", lambda: database.delete_property(OBJECT_PROPERTIES[0]), True),
+        Case("delete_class_cascade", lambda: database.delete_class_cascade(species), True),
+        Case("gui.delete_class", lambda: editor.delete_class(species), True),
+        Case("handle_file", lambda: database.handle_file(imported), prepare=copy_import_file),
+        Case("add_file_to_rep", lambda: database.add_file_to_rep(imported), True, copy_import_file),
+        Case("delete_all", database.delete_all, True, copy_import_file),
+    ]
+
+
+def reset_caches() -> None:
+    database.query_cache.bump()
+    database.triple_cache.invalidate()
+    database.name_index.invalidate()
+
+
+def restore(triples: List[tuple]) -> None:
+    graph = Graph()
+    for i in triples:
+        graph.add(i)
+    repository.graph = graph
+    reset_caches()
+
+
+def time_call(func: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run_case(case: Case, triples: List[tuple], repeat: int) -> Dict[str, Any]:
+    runs = []
+    for _ in range(repeat):
+        if case.mutates:
+            restore(triples)
+        else:
+            reset_caches()
+        if case.prepare is not None:
+            case.prepare()
+        runs.append(time_call(case.run))
+    result = {
+        "runs": runs,
+        "min": min(runs),
+        "median": statistics.median(runs),
+    }
+    if not case.mutates and case.prepare is None:
+        result["warm"] = time_call(case.run)
+    return result
+
+
+def run(sizes: List[int], repeat: int, only: Optional[List[str]] = None) -> Dict[str, Any]:
+    workdir = tempfile.mkdtemp(prefix="pbz-benchmark-")
+    settings.OWL_FILES_STORAGE = os.path.join(workdir, "ontologies") + os.sep
+    os.mkdir(settings.OWL_FILES_STORAGE)
+    results: Dict[str, Any] = {}
+    try:
+        for size in sizes:
+            print(f"Generating {size} triples...", file=sys.stderr)
+            ontology = generate_ontology(size)
+            ontology.graph.serialize(os.path.join(workdir, "source.rdf"), format="xml")
+            triples = list(ontology.graph)
+            restore(triples)
+            size_results = results[str(size)] = {"triples": len(triples), "cases": {}}
+            for case in make_cases(ontology, workdir):
+                if only and case.name not in only:
+                    continue
+                print(f"  {case.name}", file=sys.stderr)
+                size_results["cases"][case.name] = run_case(case, triples, repeat)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "triple_cache": settings.TRIPLE_CACHE,
+            "query_cache_size": settings.QUERY_CACHE_SIZE,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> None:
+    print(f"{'size':>9}  {'case':<40} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for size, size_results in current["results"].items():
+        old_cases = baseline["results"].get(size, {}).get("cases", {})
+        for name, result in size_results["cases"].items():
+            if name not in old_cases:
+                continue
+            old, new = old_cases[name]["median"], result["median"]
+            ratio = new / old if old else float("inf")
+            print(f"{size:>9}  {name:<40} {old * 1000:>8.2f}ms {new * 1000:>8.2f}ms {ratio:>6.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", help="run only the named cases")
+    parser.add_argument("--triple-cache", action="store_true", help="serve reads from the in-process triple cache")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare against")
+    args = parser.parse_args()
+
+    settings.TRIPLE_CACHE = args.triple_cache
+    results = run(args.sizes, args.repeat, args.only)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), results)
+    elif not args.output:
+        json.dump(results, sys.stdout, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import threading
+import time
+from contextlib import contextmanager
+from queue import Empty, LifoQueue
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Thread-safe pool of repository connections.
+
+    Idle connections are health checked before reuse once they have been
+    idle for longer than ``health_check_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        size: int = 4,
+        health_check_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self.factory = factory
+        self.size = size
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+        self._idle: "LifoQueue[Tuple[Any, float]]" = LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._local = threading.local()
+
+    @staticmethod
+    def _close(connection: Any) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def is_healthy(connection: Any) -> bool:
+        try:
+            connection.size()
+        except Exception:
+            return False
+        return True
+
+    def acquire(self) -> Any:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout("No free repository connection in the pool.")
+        try:
+            while True:
+                try:
+                    connection, last_used = self._idle.get_nowait()
+                except Empty:
+                    return self.factory()
+                if time.monotonic() - last_used < self.health_check_interval or self.is_healthy(connection):
+                    return connection
+                self._close(connection)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection: Any, check: bool = False) -> None:
+        try:
+            if check and not self.is_healthy(connection):
+                self._close(connection)
+            else:
+                self._idle.put((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def clear(self) -> None:
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except Empty:
+                return
+            self._close(connection)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        shared = getattr(self._local, "connection", None)
+        if shared is not None:
+            yield shared
+            return
+
+        connection = self.acquire()
+        failed = False
+        try:
+            yield connection
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.release(connection, check=failed)
+
+    @contextmanager
+    def session(self) -> Iterator[Any]:
+        """Share one connection between every query of a multi-step operation."""
+        if getattr(self._local, "connection", None) is not None:
+            yield self._local.connection
+            return
+
+        with self.connection() as connection:
+            self._local.connection = connection
+            try:
+                yield connection
+            finally:
+                self._local.connection = None
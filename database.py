@@ -1,56 +1,359 @@
-from franz.openrdf.repository import Repository
-from franz.openrdf.sail import AllegroGraphServer
+from franz.openrdf.exceptions import RequestError
+from franz.openrdf.rio.rdfformat import RDFFormat
 
 import re
 import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 import settings
+from backends import create_backend
+from connection_pool import ConnectionPool
+from terms import PropertyRow, SubjectRow, Term, TripleRow, term
+from name_index import KINDS, NameIndex
+from prepared import PreparedQueries
+from query_cache import QueryCache
+from tracing import Tracer
+from triple_cache import TripleCache
 
 
-server = AllegroGraphServer(
-    host=settings.HOST,
-    port=settings.PORT,
-    user=settings.USER,
-    password=settings.PASSWORD,
+backend = create_backend()
+
+repository = None
+_repository_lock = threading.Lock()
+
+
+def get_repository():
+    """Open the repository on first use instead of at import time."""
+    global repository
+    if repository is None:
+        with _repository_lock:
+            if repository is None:
+                repository = backend.open()
+    return repository
+
+
+pool = ConnectionPool(
+    lambda: get_repository().getConnection(),
+    size=settings.POOL_SIZE,
+    health_check_interval=settings.POOL_HEALTH_CHECK_INTERVAL,
+    timeout=settings.POOL_TIMEOUT,
 )
 
-catalog = server.openCatalog(settings.CATALOG_NAME)
+PREFIXES = {
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "owl": "http://www.w3.org/2002/07/owl#",
+    "xsd": "http://www.w3.org/2001/XMLSchema#",
+}
+
+triple_cache = TripleCache()
+
+query_cache = QueryCache(settings.QUERY_CACHE_SIZE)
+
+prepared_queries = PreparedQueries()
+
+name_index = NameIndex()
+
+tracer = Tracer(settings.TRACE_BUFFER_SIZE, settings.TRACE_FILE)
+
+
+def to_term(value: str) -> str:
+    """Convert a term written as in our queries to the form the server returns it in."""
+    value = value.strip()
+    if value == "a":
+        return f"<{PREFIXES['rdf']}type>"
+    if value.startswith('"'):
+        datatype_index = value.rfind('"^^')
+        if datatype_index > 0:
+            return value[:datatype_index + 1] + "^^" + to_term(value[datatype_index + 3:])
+        return value
+    if value.startswith("<") and value.endswith(">"):
+        return value if "://" in value else f"<{settings.BASE_IRI}{value[1:-1]}>"
+    prefix, _, name = value.partition(":")
+    return f"<{PREFIXES[prefix]}{name}>"
+
+
+def _pattern(value: str) -> Optional[str]:
+    """Like to_term, but None for a ``?variable`` that matches anything."""
+    return None if value.strip().startswith("?") else to_term(value)
+
+
+RDF_TYPE = to_term("rdf:type")
+RDFS_DOMAIN = to_term("rdfs:domain")
+RDFS_RANGE = to_term("rdfs:range")
+OWL_NAMED_INDIVIDUAL = to_term("owl:NamedIndividual")
+PROPERTY_TYPES = {to_term("owl:ObjectProperty"), to_term("owl:DatatypeProperty")}
+KIND_TYPES = {to_term("owl:" + i): i for i in KINDS}
+KIND_NAMES = {"owl:" + i for i in KINDS}
+
+
+def session():
+    return pool.session()
+
+
+@contextmanager
+def dedicated_connection() -> Iterator[Any]:
+    """A connection outside the pool, for queries that may be abandoned while they still run."""
+    connection = get_repository().getConnection()
+    try:
+        yield connection
+    finally:
+        connection.close()
+
+
+def connect() -> None:
+    """Open the repository and leave one checked connection in the pool."""
+    with pool.connection() as connection:
+        connection.size()
+
+
+def _row(subject: str, relation: str, object: str) -> TripleRow:
+    return TripleRow(term(subject), term(relation), term(object))
+
+
+def _value(binding_set, name: str) -> Term:
+    return term(binding_set.getValue(name).__str__())
+
+
+def _optional_value(binding_set, name: str) -> Optional[Term]:
+    """The value of a variable bound only by an OPTIONAL pattern, or None."""
+    value = binding_set.getValue(name)
+    return None if value is None else term(value.__str__())
+
+
+def _triple_row(binding_set) -> TripleRow:
+    return TripleRow(_value(binding_set, "s"), _value(binding_set, "r"), _value(binding_set, "o"))
+
+
+def _with_bindings(query_string: str, bindings: Optional[Dict[str, str]]) -> str:
+    """Query text with its bindings appended, as the query cache and tracer see it."""
+    if not bindings:
+        return query_string
+    return "%s\n# %s" % (query_string, " ".join("?%s=%s" % i for i in sorted(bindings.items())))
+
+
+def _select(query_string: str, row: Callable[[Any], Any], bindings: Optional[Dict[str, str]] = None) -> list:
+    """Run a SELECT through the query cache, converting each binding set with row.
+
+    With ``bindings`` the query is run as a prepared query of the connection.
+    """
+    key = _with_bindings(query_string, bindings)
+
+    def _load():
+        with pool.connection() as connection:
+            start = time.perf_counter()
+            if bindings is None:
+                result = connection.executeTupleQuery(query=query_string)
+            else:
+                result = prepared_queries.get(connection, "tuple", query_string, bindings).evaluate()
+            server_time = time.perf_counter() - start
+
+            with result:  # type: ignore
+                rows = [row(bindung_set) for bindung_set in result]  # type: ignore
+        decode_time = time.perf_counter() - start - server_time
+        tracer.record("select", key, server_time, decode_time, len(rows), _size(key, rows))
+        return rows
+
+    return list(query_cache.fetch(key, _load))
+
+
+def _size(query_string: str, rows: Iterable[Iterable[Any]] = ()) -> int:
+    """Approximate bytes sent and received, from the query and the N-Triples text of the rows."""
+    if not tracer.enabled:
+        return 0
+    return len(query_string.encode()) + sum(len(str(i)) for row in rows for i in row if i is not None)
+
+
+def _update(connection, query_string: str):
+    start = time.perf_counter()
+    result = connection.executeUpdate(query=query_string)
+    tracer.record("update", query_string, time.perf_counter() - start, bytes=_size(query_string))
+    query_cache.bump()
+    return result
+
+
+def get_triple_cache() -> Optional[TripleCache]:
+    if not settings.TRIPLE_CACHE:
+        return None
+    if triple_cache.loaded:
+        return triple_cache
+    with triple_cache.lock:
+        if triple_cache.loaded:
+            return triple_cache
+        query_string = "SELECT ?s ?r ?o WHERE {?s ?r ?o}"
+        with pool.connection() as connection:
+            start = time.perf_counter()
+            result = connection.executeTupleQuery(query=query_string)
+            server_time = time.perf_counter() - start
+
+            with result:  # type: ignore
+                for bindung_set in result:  # type: ignore
+                    triple_cache.add(
+                        bindung_set.getValue("s").__str__(),
+                        bindung_set.getValue("r").__str__(),
+                        bindung_set.getValue("o").__str__(),
+                    )
+        tracer.record(
+            "select", query_string, server_time, time.perf_counter() - start - server_time, len(triple_cache),
+        )
+        triple_cache.loaded = True
+    return triple_cache
 
-repository = catalog.getRepository(settings.REPOSITORY_NAME, Repository.ACCESS)
+
+EXPORT_FORMATS = {
+    "nt": RDFFormat.NTRIPLES,
+    "ttl": RDFFormat.TURTLE,
+    "rdf": RDFFormat.RDFXML,
+}
+
+
+def export_statements(path: str, format: str = "nt", class_name: Optional[str] = None) -> None:
+    """Write the repository, or ``class_name`` with its subclasses and their individuals, to ``path``.
+
+    The server response is copied to the file as it arrives, so nothing is held in memory.
+    """
+    bindings: Dict[str, str] = {}
+    if class_name is None:
+        query_string = "CONSTRUCT WHERE { ?s ?p ?o }"
+    else:
+        subject = name_term(class_name)
+        if subject is None:
+            raise ValueError(f"Invalid name {class_name!r}.")
+        query_string = """
+            CONSTRUCT { ?s ?p ?o }
+            WHERE {
+              ?s (rdf:type|rdfs:subClassOf)* ?class .
+              ?s ?p ?o .
+            }
+        """
+        bindings = {"class": to_term(subject)}
+    temporary_path = path + ".tmp"
+    try:
+        with pool.connection() as connection:
+            start = time.perf_counter()
+            prepared_queries.get(connection, "graph", query_string, bindings).evaluate(
+                output=temporary_path, output_format=EXPORT_FORMATS[format],
+            )
+            key = _with_bindings(query_string, bindings)
+            tracer.record("export", key, time.perf_counter() - start, bytes=os.path.getsize(temporary_path))
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+    os.replace(temporary_path, path)
+
+
+def get_name_index() -> NameIndex:
+    """Load the local names of classes, individuals and properties on first use.
+
+    Writes below keep the loaded index up to date, or drop it when they can't
+    tell which names they touched.
+    """
+    if name_index.loaded:
+        return name_index
+    generation = query_cache.generation
+    cache = get_triple_cache()
+    if cache is not None:
+        entries = [
+            (term(subject).name, kind)
+            for type, kind in KIND_TYPES.items()
+            for subject, _, _ in cache.match(p=RDF_TYPE, o=type)
+        ]
+    else:
+        query_string = """
+            SELECT ?s ?type WHERE {
+              VALUES ?type { owl:Class owl:NamedIndividual owl:ObjectProperty owl:DatatypeProperty }
+              ?s a ?type .
+            }
+        """
+        rows = _select(query_string, lambda bindung_set: (_value(bindung_set, "s"), _value(bindung_set, "type")))
+        entries = [(s.name, KIND_TYPES[type.text]) for s, type in rows if s.namespace is not None]
+    if generation == query_cache.generation:
+        name_index.load(entries)
+    return name_index
+
+
+def _index_names(triples: Iterable[Tuple[str, str, str]], add: bool) -> None:
+    if not name_index.loaded:
+        return
+    for subject, relation, object in triples:
+        kind = KIND_TYPES.get(to_term(object))
+        if kind is not None and to_term(relation) == RDF_TYPE:
+            name = term(to_term(subject)).name
+            if add:
+                name_index.add(name, kind)
+            else:
+                name_index.remove(name, kind)
 
 
 def add_file_to_rep(filename: str):
-    with repository.getConnection() as connection:
+    with pool.connection() as connection:
+        start = time.perf_counter()
         connection.addFile(settings.OWL_FILES_STORAGE + filename)
+        tracer.record("load", filename, time.perf_counter() - start)
+        query_cache.bump()
+    triple_cache.invalidate()
+    name_index.invalidate()
+
+
+IRI_PATTERN = re.compile(
+    r"http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+#?"
+)
+
+KEPT_NAMESPACES = {
+    "http://www.w3.org/2001/XMLSchema#",
+    "https://github.com/owlcs/owlapi",
+    "http://www.w3.org/2002/07/owl#",
+    "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "http://www.w3.org/XML/1998/namespace",
+    "http://www.w3.org/2000/01/rdf-schema#",
+}
+
+CHUNK_SIZE = 1 << 20
+
+# Long enough to hold "https://", the longest prefix that doesn't match yet.
+_HOLD_BACK = 8
+
+
+def _rewrite_iri(match: "re.Match[str]") -> str:
+    iri = match.group()
+    return iri if iri in KEPT_NAMESPACES else settings.BASE_IRI
+
+
+def _rewrite_chunk(text: str, final: bool) -> Tuple[str, str]:
+    """Rewrite IRIs in text, holding back a tail that may continue in the next chunk."""
+    cut = len(text) if final else max(0, len(text) - _HOLD_BACK)
+    position = 0
+    output = []
+    for match in IRI_PATTERN.finditer(text):
+        if not final and match.end() == len(text):
+            cut = match.start()
+            break
+        if match.start() >= cut:
+            break
+        output.append(text[position:match.start()])
+        output.append(_rewrite_iri(match))
+        position = match.end()
+        cut = max(cut, position)
+    output.append(text[position:cut])
+    return "".join(output), text[cut:]
 
 
 def handle_file(filename: str):
-    with open(settings.OWL_FILES_STORAGE + filename, "r") as f:
-        content = f.read()
-    exception_list = [
-        "http://www.w3.org/2001/XMLSchema#",
-        "https://github.com/owlcs/owlapi",
-        "http://www.w3.org/2002/07/owl#",
-        "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
-        "http://www.w3.org/XML/1998/namespace",
-        "http://www.w3.org/2000/01/rdf-schema#",
-    ]
-    url = re.findall(
-        r"http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+#?",
-        content,
-    )
-    url2 = set()
-    for i in url:
-        if i not in exception_list:
-            url2.add(i)
-    url2 = sorted(list(url2), key=lambda x: len(x), reverse=True)
-
-    for i in url2:
-        content = content.replace(
-            i, f"http://127.0.0.1:10035/repositories/{settings.REPOSITORY_NAME}/"
-        )
-    with open(settings.OWL_FILES_STORAGE + filename, "w") as f:
-        f.write(content)
+    path = settings.OWL_FILES_STORAGE + filename
+    temporary_path = path + ".tmp"
+    with open(path, "r", encoding="utf-8") as source, open(temporary_path, "w", encoding="utf-8") as target:
+        pending = ""
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            rewritten, pending = _rewrite_chunk(pending + chunk, final=not chunk)
+            target.write(rewritten)
+            if not chunk:
+                break
+    os.replace(temporary_path, path)
 
 
 def write_file(filename: str) -> bool:
@@ -76,104 +379,360 @@ def write_file(filename: str) -> bool:
 
 def execute_get_query(subject: str="?s", relation: str="?r", object: str="?o"):
     """select query for get endpoints"""
-    query_string = "SELECT distinct ?s ?r ?o WHERE {%s %s %s}" % (
-        subject,
-        relation,
-        object,
+    cache = get_triple_cache()
+    if cache is not None:
+        return [_row(*i) for i in cache.match(_pattern(subject), _pattern(relation), _pattern(object))]
+
+    query_string = "SELECT distinct ?s ?r ?o WHERE {?s ?r ?o}"
+    bindings = {name: to_term(i) for name, i in zip("sro", (subject, relation, object)) if _pattern(i) is not None}
+    fixed = {name: term(i) for name, i in bindings.items()}
+
+    return _select(
+        query_string,
+        lambda bindung_set: TripleRow(*(fixed.get(i) or _value(bindung_set, i) for i in "sro")),
+        bindings,
     )
-    result_list = []
 
-    with repository.getConnection() as connection:
-        result = connection.executeTupleQuery(query=query_string)
 
-        with result:  # type: ignore
-            for bindung_set in result:  # type: ignore
-                result_list.append(
-                    {
-                        "subject": bindung_set.getValue("s").__str__(),
-                        "relation": bindung_set.getValue("r").__str__(),
-                        "object": bindung_set.getValue("o").__str__(),
-                    }
-                )
+def get_objects(object: str):
+    cache = get_triple_cache()
+    if cache is not None:
+        return [
+            _row(*i)
+            for subject, _, _ in cache.match(p=RDF_TYPE, o=to_term(object))
+            for i in cache.match(s=subject)
+        ]
 
-    return result_list
+    query = "SELECT distinct ?s ?r ?o WHERE {?s ?r ?o . ?s a ?type}"
 
+    return _select(query, _triple_row, {"type": to_term(object)})
 
-def get_objects(object: str):
-    query = "SELECT distinct ?s ?r ?o WHERE {?s ?r ?o . ?s a %s}" % (object)
-    result_list = []
-
-    with repository.getConnection() as connection:
-        result = connection.executeTupleQuery(query=query)
-
-    with result:  # type: ignore
-        for bindung_set in result:  # type: ignore
-            result_list.append(
-                {
-                    "subject": bindung_set.getValue("s").__str__(),
-                    "relation": bindung_set.getValue("r").__str__(),
-                    "object": bindung_set.getValue("o").__str__(),
-                }
-            )
 
-    return result_list
+def get_properties(property_type: str):
+    query_string = """
+        SELECT distinct ?p ?domain ?range WHERE {
+          ?p rdf:type ?type .
+          OPTIONAL { ?p rdfs:domain ?domain }
+          OPTIONAL { ?p rdfs:range ?range }
+        }
+    """
+    cache = get_triple_cache()
+    if cache is not None:
+        result_list = []
+        for property, _, _ in cache.match(p=RDF_TYPE, o=to_term(property_type)):
+            domains: List[Optional[Term]] = [term(i[2]) for i in cache.match(property, RDFS_DOMAIN)] or [None]
+            ranges: List[Optional[Term]] = [term(i[2]) for i in cache.match(property, RDFS_RANGE)] or [None]
+            for domain in domains:
+                for property_range in ranges:
+                    result_list.append(PropertyRow(term(property), domain, property_range))
+        return result_list
 
+    return _select(
+        query_string,
+        lambda bindung_set: PropertyRow(
+            _value(bindung_set, "p"), _optional_value(bindung_set, "domain"), _optional_value(bindung_set, "range")
+        ),
+        {"type": to_term(property_type)},
+    )
 
-def execute_get_individuals_query(name=None, class_name=None):
-    if name:
-        query_string = """SELECT distinct ?s ?r ?o WHERE {?s ?r ?o . ?s a owl:NamedIndividual FILTER(?r != rdf:type)}"""
-    elif class_name:
-        query_string = (
-            """SELECT distinct ?s ?r ?o WHERE {?s ?r ?o . ?s a owl:NamedIndividual}"""
-        )
+
+IRI_UNSAFE = re.compile(r'[\s<>"{}|^`\\]')
+
+
+def name_term(name: str) -> Optional[str]:
+    """IRI of an ontology entity by its local name, or None if the name can't be one."""
+    if not name or IRI_UNSAFE.search(name):
+        return None
+    return f"<{name}>"
+
+
+def escape_literal(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\r", "\\r")
+
+
+LITERAL_PATTERN = re.compile(r'"(?:[^"\\\r\n]|\\.)*"(?:\^\^(?P<datatype>\S+)|@[A-Za-z]+(?:-[A-Za-z0-9]+)*)?')
+
+
+def _checked_term(value: str) -> str:
+    """A term of a write as given, or ValueError if it would not stay one term in the update."""
+    value = value.strip()
+    if value.startswith("<"):
+        valid = value.endswith(">") and name_term(value[1:-1]) is not None
+    elif value.startswith('"'):
+        match = LITERAL_PATTERN.fullmatch(value)
+        valid = match is not None
+        if match is not None and match.group("datatype"):
+            _checked_term(match.group("datatype"))
     else:
-        query_string = (
-            """SELECT distinct ?s WHERE {?s ?r ?o . ?s a owl:NamedIndividual}"""
-        )
-    result_list = []
+        prefix, colon, name = value.partition(":")
+        valid = value == "a" or bool(colon) and prefix in PREFIXES and re.fullmatch(r"[\w.-]*", name) is not None
+    if not valid:
+        raise ValueError(f"Invalid name or value {value!r}.")
+    return value
 
-    with repository.getConnection() as connection:
-        result = connection.executeTupleQuery(query=query_string)
-        with result:  # type: ignore
-            for bindung_set in result:  # type: ignore
-                if name or class_name:
-                    request = {
-                        "subject": bindung_set.getValue("s").__str__(),
-                        "relation": bindung_set.getValue("r").__str__(),
-                        "object": bindung_set.getValue("o").__str__(),
-                    }
-                else:
-                    request = {"subject": bindung_set.getValue("s").__str__()}
-                result_list.append(request)
-    result = []
+
+def ask_typed(name: str, type: str) -> bool:
+    subject = name_term(name)
+    if subject is None or type not in KIND_NAMES:
+        return False
+    cache = get_triple_cache()
+    if cache is not None:
+        return cache.contains(to_term(subject), RDF_TYPE, to_term(type))
+
+    query_string = "ASK { ?s a ?type }"
+    bindings = {"s": to_term(subject), "type": to_term(type)}
+    key = _with_bindings(query_string, bindings)
+
+    def _load():
+        with pool.connection() as connection:
+            start = time.perf_counter()
+            result = bool(prepared_queries.get(connection, "boolean", query_string, bindings).evaluate())
+        tracer.record("ask", key, time.perf_counter() - start, rows=1, bytes=_size(key))
+        return result
+
+    return query_cache.fetch(key, _load)
+
+
+def find_typed(names: Iterable[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+    """Return the (name, type) pairs that exist, checked with a single VALUES query.
+
+    Types other than the four ``owl:`` kinds are never found.
+    """
+    terms: Dict[Tuple[str, str], Tuple[str, str, str]] = {}
+    for name, type in names:
+        subject = name_term(name)
+        if subject is not None and type in KIND_NAMES:
+            terms[(to_term(subject), to_term(type))] = (name, type, subject)
+    if not terms:
+        return set()
+    cache = get_triple_cache()
+    if cache is not None:
+        return {(name, type) for (s, o), (name, type, _) in terms.items() if cache.contains(s, RDF_TYPE, o)}
+
+    values = " ".join("(%s %s)" % (subject, type) for name, type, subject in terms.values())
+    query_string = "SELECT ?s ?type WHERE { VALUES (?s ?type) { %s } ?s a ?type }" % values
+    rows = _select(
+        query_string,
+        lambda bindung_set: (bindung_set.getValue("s").__str__(), bindung_set.getValue("type").__str__()),
+    )
+
+    return {terms[key][:2] for key in rows if key in terms}
+
+
+def get_typed_subject(name: str, type: str):
+    subject = name_term(name)
+    if subject is None or type not in KIND_NAMES:
+        return []
+    cache = get_triple_cache()
+    subject_text = to_term(subject)
+    if cache is not None:
+        if not cache.contains(subject_text, RDF_TYPE, to_term(type)):
+            return []
+        return [_row(*i) for i in cache.match(s=subject_text)]
+
+    query_string = "SELECT ?r ?o WHERE { ?s a ?type . ?s ?r ?o }"
+    subject_term = term(subject_text)
+
+    return _select(
+        query_string,
+        lambda bindung_set: TripleRow(subject_term, _value(bindung_set, "r"), _value(bindung_set, "o")),
+        {"s": subject_text, "type": to_term(type)},
+    )
+
+
+def get_individuals_info(names: Iterable[str]) -> Dict[str, List[TripleRow]]:
+    """Every triple of each named individual, rdf:type included, from one VALUES query.
+
+    Keyed by name in the order given; names that aren't individuals are left out.
+    """
+    subjects = {}
+    for name in names:
+        subject = name_term(name)
+        if subject is not None:
+            subjects[to_term(subject)] = name
+    if not subjects:
+        return {}
+
+    result: Dict[str, List[TripleRow]] = {}
+    cache = get_triple_cache()
+    if cache is not None:
+        for subject, name in subjects.items():
+            if cache.contains(subject, RDF_TYPE, OWL_NAMED_INDIVIDUAL):
+                result[name] = [_row(*i) for i in cache.match(s=subject)]
+        return result
+
+    query_string = """
+        SELECT distinct ?s ?r ?o WHERE {
+          VALUES ?s { %s }
+          ?s a owl:NamedIndividual .
+          ?s ?r ?o .
+        }
+    """ % " ".join(subjects)
+    rows = _select(query_string, _triple_row)
+    for name in subjects.values():
+        result[name] = []
+    for i in rows:
+        result[subjects[i.subject.text]].append(i)
+    return {name: rows for name, rows in result.items() if rows}
+
+
+def _get_cached_individuals(cache: TripleCache, subject=None, class_term=None, with_properties=False):
+    individuals = [i[0] for i in cache.match(p=RDF_TYPE, o=OWL_NAMED_INDIVIDUAL)]
+    if subject:
+        if not cache.contains(subject, RDF_TYPE, OWL_NAMED_INDIVIDUAL):
+            return []
+        return [_row(*i) for i in cache.match(s=subject) if i[1] != RDF_TYPE]
+    elif class_term:
+        members = [i for i in individuals if cache.contains(i, RDF_TYPE, class_term)]
+        if with_properties:
+            return [_row(*i) for subject in members for i in cache.match(s=subject) if i[1] != RDF_TYPE]
+        return [_row(i, RDF_TYPE, class_term) for i in members]
+    return [SubjectRow(term(i)) for i in individuals]
+
+
+def execute_get_individuals_query(
+    name: Optional[str] = None,
+    class_name: Optional[str] = None,
+    with_properties: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0,
+):
+    """Individuals, the property values of the one called ``name``, or the members of ``class_name``.
+
+    Members are returned as ``(individual, rdf:type, class)`` rows, or as their
+    property values when ``with_properties`` is set. ``limit`` and ``offset``
+    page through the rows on the server.
+    """
+    subject = class_term = None
     if name:
-        for i in result_list:
-            if i["subject"].split("/")[-1][:-1] == name:
-                result.append(i)
-        result_list = result
+        subject = name_term(name)
+        if subject is None:
+            return []
     elif class_name:
-        for i in result_list:
-            if (
-                i["object"].split("/")[-1][:-1] == class_name
-                and i["relation"].split("#")[1][:-1] == "type"
-            ):
-                result.append(i)
-        result_list = result
-    return result_list
+        class_term = name_term(class_name)
+        if class_term is None:
+            return []
+
+    cache = get_triple_cache()
+    if cache is not None:
+        result_list = _get_cached_individuals(
+            cache, to_term(subject) if subject else None, to_term(class_term) if class_term else None, with_properties,
+        )
+        return result_list[offset:None if limit is None else offset + limit]
+
+    bindings = None
+    row: Callable[[Any], tuple]
+    if subject:
+        query_string = """
+            SELECT ?r ?o WHERE {
+              ?s a owl:NamedIndividual .
+              ?s ?r ?o .
+              FILTER(?r != rdf:type)
+            }
+        """
+        bindings = {"s": to_term(subject)}
+        subject_text = to_term(subject)
+        row = lambda bindung_set: TripleRow(term(subject_text), _value(bindung_set, "r"), _value(bindung_set, "o"))
+    elif class_term and with_properties:
+        query_string = """
+            SELECT ?s ?r ?o WHERE {
+              ?s a ?class .
+              ?s a owl:NamedIndividual .
+              ?s ?r ?o .
+              FILTER(?r != rdf:type)
+            }
+        """
+        bindings = {"class": to_term(class_term)}
+        row = _triple_row
+    elif class_term:
+        query_string = """
+            SELECT ?s WHERE {
+              ?s a ?class .
+              ?s a owl:NamedIndividual .
+            }
+        """
+        class_text = to_term(class_term)
+        bindings = {"class": class_text}
+        row = lambda bindung_set: TripleRow(_value(bindung_set, "s"), term(RDF_TYPE), term(class_text))
+    else:
+        query_string = """SELECT distinct ?s WHERE {?s a owl:NamedIndividual}"""
+        row = lambda bindung_set: SubjectRow(_value(bindung_set, "s"))
+    if limit is not None:
+        query_string += "\nLIMIT %d OFFSET %d" % (limit, offset)
+    return _select(query_string, row, bindings)
 
 
 def execute_post_query(subject: str, relation: str, object: str):
+    subject, relation, object = map(_checked_term, (subject, relation, object))
     string_query = "INSERT DATA { %s %s %s}" % (subject, relation, object)
 
-    with repository.getConnection() as connection:
-        return connection.executeUpdate(query=string_query)
+    with pool.connection() as connection:
+        result = _update(connection, string_query)
+    with triple_cache.lock:
+        if triple_cache.loaded:
+            triple_cache.add(to_term(subject), to_term(relation), to_term(object))
+    _index_names([(subject, relation, object)], add=True)
+    return result
 
 
 def execute_delete_query(subject: str, predicate: str, object: str):
+    subject, predicate, object = map(_checked_term, (subject, predicate, object))
     string_query = "DELETE DATA { %s %s %s }" % (subject, predicate, object)
 
-    with repository.getConnection() as connection:
-        return connection.executeUpdate(query=string_query)
+    with pool.connection() as connection:
+        result = _update(connection, string_query)
+    with triple_cache.lock:
+        if triple_cache.loaded:
+            triple_cache.remove(to_term(subject), to_term(predicate), to_term(object))
+    _index_names([(subject, predicate, object)], add=False)
+    return result
+
+
+def _execute_data_update(operation: str, triples: Iterable[Tuple[str, str, str]]) -> bool:
+    """Send every triple in one ``INSERT DATA``/``DELETE DATA`` request.
+
+    The server applies a single update request as one transaction, so either
+    all triples are committed (``True``) or the whole request is rolled back
+    (``False``).
+    """
+    checked = [tuple(map(_checked_term, i)) for i in triples]
+    if not checked:
+        return True
+    string_query = "%s DATA {\n%s\n}" % (
+        operation,
+        "\n".join("  %s %s %s ." % i for i in checked),
+    )
+
+    try:
+        with pool.connection() as connection:
+            _update(connection, string_query)
+    except RequestError:
+        return False
+    return True
+
+
+def execute_post_many(triples: Iterable[Tuple[str, str, str]]) -> bool:
+    triples = list(triples)
+    if not _execute_data_update("INSERT", triples):
+        return False
+    with triple_cache.lock:
+        if triple_cache.loaded:
+            for i in triples:
+                triple_cache.add(*map(to_term, i))
+    _index_names(triples, add=True)
+    return True
+
+
+def execute_delete_many(triples: Iterable[Tuple[str, str, str]]) -> bool:
+    triples = list(triples)
+    if not _execute_data_update("DELETE", triples):
+        return False
+    with triple_cache.lock:
+        if triple_cache.loaded:
+            for i in triples:
+                triple_cache.remove(*map(to_term, i))
+    _index_names(triples, add=False)
+    return True
 
 
 def delete_all():
@@ -184,11 +743,15 @@ def delete_all():
         if os.path.isfile(file_path):
             os.remove(file_path)
 
-    with repository.getConnection() as connection:
-        return connection.executeUpdate(query=string_query)
+    with pool.connection() as connection:
+        result = _update(connection, string_query)
+    triple_cache.clear()
+    name_index.invalidate()
+    return result
 
 
 def delete_class_or_individual(name: str):
+    _checked_term(f"<{name}>")
     string_query = """
         DELETE WHERE{{
           <{0}> ?p ?o .
@@ -199,11 +762,105 @@ def delete_class_or_individual(name: str):
         }};
     """.format(name)
 
-    with repository.getConnection() as connection:
-        return connection.executeUpdate(query=string_query)
+    with pool.connection() as connection:
+        result = _update(connection, string_query)
+    with triple_cache.lock:
+        if triple_cache.loaded:
+            triple_cache.remove_node(to_term(f"<{name}>"), subject=True, object=True)
+    name_index.remove(term(to_term(f"<{name}>")).name)
+    return result
+
+
+def delete_class_cascade(class_name: str) -> int:
+    """Delete a class with the individuals and properties that point at it.
+
+    Everything is removed by one update request. Returns the number of triples
+    removed, counted from the triples the request matches just before it runs,
+    so writes to other parts of the repository meanwhile don't change it.
+    """
+    _checked_term(f"<{class_name}>")
+    count_query = """
+        SELECT (COUNT(*) AS ?n) WHERE {{
+          SELECT DISTINCT ?s ?p ?o WHERE {{
+            {{
+              ?d ?x <{0}> .
+              ?d a ?t .
+              FILTER(?t IN (owl:ObjectProperty, owl:DatatypeProperty))
+              ?s ?d ?o .
+              FILTER(?o != <{0}>)
+              BIND(?d AS ?p)
+            }}
+            UNION {{
+              ?d ?x <{0}> .
+              ?d a owl:NamedIndividual .
+              ?s ?p ?d .
+              BIND(?d AS ?o)
+            }}
+            UNION {{
+              ?d ?x <{0}> .
+              ?d a ?t .
+              FILTER(?t IN (owl:NamedIndividual, owl:ObjectProperty, owl:DatatypeProperty))
+              ?d ?p ?o .
+              BIND(?d AS ?s)
+            }}
+            UNION {{ <{0}> ?p ?o . BIND(<{0}> AS ?s) }}
+            UNION {{ ?s ?p <{0}> . BIND(<{0}> AS ?o) }}
+          }}
+        }}
+    """.format(class_name)
+    string_query = """
+        DELETE {{ ?s ?d ?v }}
+        WHERE {{
+          ?d ?x <{0}> .
+          ?d a ?t .
+          FILTER(?t IN (owl:ObjectProperty, owl:DatatypeProperty))
+          ?s ?d ?v .
+          FILTER(?v != <{0}>)
+        }};
+
+        DELETE {{ ?u ?q ?d }}
+        WHERE {{
+          ?d ?x <{0}> .
+          ?d a owl:NamedIndividual .
+          ?u ?q ?d .
+        }};
+
+        DELETE {{ ?d ?p ?o }}
+        WHERE {{
+          ?d ?x <{0}> .
+          ?d a ?t .
+          FILTER(?t IN (owl:NamedIndividual, owl:ObjectProperty, owl:DatatypeProperty))
+          ?d ?p ?o .
+        }};
+
+        DELETE WHERE{{
+          <{0}> ?p ?o .
+        }};
+
+        DELETE WHERE{{
+          ?s ?p <{0}> .
+        }};
+    """.format(class_name)
+
+    with session() as connection:
+        removed = int(_select(count_query, lambda bindung_set: (_value(bindung_set, "n"),))[0][0].label)
+        _update(connection, string_query)
+    with triple_cache.lock:
+        if triple_cache.loaded:
+            node = to_term(f"<{class_name}>")
+            for dependent in {i[0] for i in triple_cache.match(o=node)}:
+                types = {i[2] for i in triple_cache.match(dependent, RDF_TYPE)}
+                individual = OWL_NAMED_INDIVIDUAL in types
+                property = bool(types & PROPERTY_TYPES)
+                if individual or property:
+                    triple_cache.remove_node(dependent, subject=True, relation=property, object=individual)
+            triple_cache.remove_node(node, subject=True, object=True)
+    name_index.invalidate()
+    return removed
 
 
 def delete_property(property_name: str):
+    _checked_term(f"<{property_name}>")
     string_query = """
         DELETE WHERE{{
           <{0}> ?p ?o .
@@ -214,11 +871,18 @@ def delete_property(property_name: str):
         }};
     """.format(property_name)
 
-    with repository.getConnection() as connection:
-        return connection.executeUpdate(query=string_query)
+    with pool.connection() as connection:
+        result = _update(connection, string_query)
+    with triple_cache.lock:
+        if triple_cache.loaded:
+            triple_cache.remove_node(to_term(f"<{property_name}>"), subject=True, relation=True)
+    name_index.remove(term(to_term(f"<{property_name}>")).name)
+    return result
 
 
 def rename_subject_object(old_name: str, new_name: str):
+    for i in (old_name, new_name):
+        _checked_term(f"<{i}>")
     string_query = """
         DELETE {{
           <{0}> ?p ?o .
@@ -243,11 +907,19 @@ def rename_subject_object(old_name: str, new_name: str):
         old_name, new_name
     )
 
-    with repository.getConnection() as connection:
-        return connection.executeUpdate(query=string_query)
+    with pool.connection() as connection:
+        result = _update(connection, string_query)
+    with triple_cache.lock:
+        if triple_cache.loaded:
+            triple_cache.rename(to_term(f"<{old_name}>"), to_term(f"<{new_name}>"), 0)
+            triple_cache.rename(to_term(f"<{old_name}>"), to_term(f"<{new_name}>"), 2)
+    name_index.rename({old_name: new_name})
+    return result
 
 
 def rename_relation(old_name: str, new_name: str):
+    for i in (old_name, new_name):
+        _checked_term(f"<{i}>")
     string_query = """
         DELETE {{
           <{0}> ?p ?o .
@@ -272,26 +944,172 @@ def rename_relation(old_name: str, new_name: str):
         old_name, new_name
     )
 
-    with repository.getConnection() as connection:
-        return connection.executeUpdate(query=string_query)
+    with pool.connection() as connection:
+        result = _update(connection, string_query)
+    with triple_cache.lock:
+        if triple_cache.loaded:
+            triple_cache.rename(to_term(f"<{old_name}>"), to_term(f"<{new_name}>"), 0)
+            triple_cache.rename(to_term(f"<{old_name}>"), to_term(f"<{new_name}>"), 1)
+    name_index.rename({old_name: new_name})
+    return result
+
+
+RENAME_QUERY = """
+    DELETE {{ ?old ?p ?o }}
+    INSERT {{ ?new ?p ?o }}
+    WHERE {{
+      VALUES (?old ?new) {{ {0} }}
+      ?old ?p ?o .
+    }};
+
+    DELETE {{ ?s ?old ?o }}
+    INSERT {{ ?s ?new ?o }}
+    WHERE {{
+      VALUES (?old ?new) {{ {0} }}
+      ?s ?old ?o .
+    }};
+
+    DELETE {{ ?s ?p ?old }}
+    INSERT {{ ?s ?p ?new }}
+    WHERE {{
+      VALUES (?old ?new) {{ {0} }}
+      ?s ?p ?old .
+    }};
+"""
+
+
+def rename_many(mapping: Dict[str, str]) -> Tuple[int, List[str]]:
+    """Rename every ``old -> new`` pair in subject, relation and object position with one update.
+
+    When a new name is also renamed (a swap or a chain) the names go through
+    temporary IRIs first, so the pairs behave as if applied at once. Returns
+    the number of triples that were rewritten and the old names that matched
+    nothing.
+    """
+    mapping = {old: new for old, new in mapping.items() if old != new}
+    terms: Dict[str, str] = {}
+    for old, new in mapping.items():
+        old_term, new_term = name_term(old), name_term(new)
+        if old_term is None or new_term is None:
+            raise ValueError(f"Invalid name {old if old_term is None else new!r}.")
+        terms[old_term] = new_term
+    if not terms:
+        return 0, []
+    olds = " ".join(terms)
+    count_query = """
+        SELECT (COUNT(*) AS ?n) WHERE {{
+          VALUES ?old {{ {0} }}
+          {{ ?old ?p ?o }}
+          UNION {{ ?s ?old ?o FILTER(?s NOT IN ({1})) }}
+          UNION {{ ?s ?p ?old FILTER(?s NOT IN ({1}) && ?p NOT IN ({1})) }}
+        }}
+    """.format(olds, olds.replace(" ", ", "))
+    found_query = """
+        SELECT DISTINCT ?old WHERE {{
+          VALUES ?old {{ {0} }}
+          {{ ?old ?p ?o }} UNION {{ ?s ?old ?o }} UNION {{ ?s ?p ?old }}
+        }}
+    """.format(olds)
+
+    if set(terms.values()) & set(terms):
+        temporary = {old: f"<urn:x-rename:{i}>" for i, old in enumerate(terms)}
+        stages = [temporary, {temporary[old]: new for old, new in terms.items()}]
+    else:
+        stages = [terms]
+    string_query = "".join(
+        RENAME_QUERY.format(" ".join(f"({old} {new})" for old, new in stage.items())) for stage in stages
+    )
+
+    with session() as connection:
+        touched = int(_select(count_query, lambda bindung_set: (_value(bindung_set, "n"),))[0][0].label)
+        found = {i.text for i, in _select(found_query, lambda bindung_set: (_value(bindung_set, "old"),))}
+        _update(connection, string_query)
+    with triple_cache.lock:
+        if triple_cache.loaded:
+            for position in range(3):
+                triple_cache.rename_many({to_term(old): to_term(new) for old, new in terms.items()}, position)
+    name_index.rename(mapping)
+    return touched, [old for old, old_term in zip(mapping, terms) if to_term(old_term) not in found]
+
+
+# Strings, IRIs and comments, which may hold braces or keywords that aren't part of the query.
+QUERY_TOKEN = re.compile(r"""\"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|<[^<>"{}|^`\\\s]*>|#[^\n]*""")
+
+SOLUTION_MODIFIER = re.compile(r"(GROUP\s+BY|HAVING|ORDER\s+BY)\b", re.IGNORECASE)
+
+
+def _mask_query(query: str) -> str:
+    """The query with comments removed and strings and IRIs emptied."""
+    return QUERY_TOKEN.sub(lambda match: {"#": "", "<": "<>"}.get(match.group()[0], match.group()[0] * 2), query)
+
+
+def is_pageable(query: str) -> bool:
+    """Whether LIMIT and OFFSET can be appended: a SELECT that ends with its WHERE clause or solution modifiers."""
+    body = re.sub(r"^\s*((PREFIX\s+\S*\s*<>|BASE\s*<>)\s*)*", "", _mask_query(query), flags=re.IGNORECASE)
+    if not re.match(r"SELECT\b", body, re.IGNORECASE):
+        return False
+    start = body.find("{")
+    if start < 0:
+        return False
+    depth = 0
+    for end in range(start, len(body)):
+        depth += {"{": 1, "}": -1}.get(body[end], 0)
+        if depth == 0:
+            break
+    else:
+        return False
+    tail = body[end + 1:].strip()
+    return not tail or bool(SOLUTION_MODIFIER.match(tail)) and not re.search(
+        r"(?<![?$\w])(LIMIT|OFFSET|VALUES)\b|\{", tail, re.IGNORECASE
+    )
+
+
+class QueryCancelled(Exception):
+    pass
 
 
-def execute_raw_query(query: str):
+def execute_raw_query(
+    query: str,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    timeout: Optional[float] = None,
+    cancelled: Optional[threading.Event] = None,
+    progress: Optional[Callable[[int], None]] = None,
+):
+    if limit is not None and is_pageable(query):
+        query = "%s\nLIMIT %d OFFSET %d" % (query.rstrip(), limit, offset)
     query_result = []
-    with repository.getConnection() as connection:
+    # A cancelled query keeps its connection until the server answers, so it must not hold a pooled one.
+    with dedicated_connection() as connection:
         try:
-            result = connection.executeTupleQuery(query=query)
-            with result:  # type: ignore
-                for binding_set in result:  # type: ignore
-                    row_data = {}
-                    for variable_name in binding_set.getBindingNames():
-                        value = binding_set.getValue(variable_name)
-                        row_data[variable_name] = value
-                    query_result.append(row_data)
-        except Exception as e:
+            start = time.perf_counter()
+            result = connection.executeTupleQuery(query=backend.with_timeout(query, timeout) if timeout else query)
+            server_time = time.perf_counter() - start
+        except RequestError as e:
             if e.message == 'SPARQL/Update queries can only be performed through POST requests.':
-                query_result = connection.executeUpdate(query=query)
+                query_result = _update(connection, query)
+                triple_cache.invalidate()
+                name_index.invalidate()
                 return query_result
             else:
                 return e.message
+        with result:  # type: ignore
+            for binding_set in result:  # type: ignore
+                if cancelled is not None and cancelled.is_set():
+                    raise QueryCancelled(query)
+                row_data = {}
+                for variable_name in binding_set.getBindingNames():
+                    value = binding_set.getValue(variable_name)
+                    row_data[variable_name] = None if value is None else term(value.__str__())
+                query_result.append(row_data)
+                if progress is not None and len(query_result) % 100 == 0:
+                    progress(len(query_result))
+        tracer.record(
+            "select",
+            query,
+            server_time,
+            time.perf_counter() - start - server_time,
+            len(query_result),
+            _size(query, (i.values() for i in query_result)),
+        )
     return query_result
@@ -5,14 +5,21 @@ from tkinter import filedialog
 import tkinter as tk
 from tkinter import messagebox
 
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, Callable, Optional, Sequence, Set
 from dataclasses import dataclass
+from collections import Counter
 import re
+import threading
 
 import database
+import importer
+import settings
+from autocomplete import AutocompleteEntry
 from database import write_file
 from services import validate_input, check_class_existing, get_full_info
 from template import data_property_template
+from terms import TripleRow
+from worker import BackgroundWorker, CancellableJob
 
 
 @dataclass(slots=True)
@@ -26,6 +33,8 @@ class OntotlogyEditor:
     def __init__(self, name: str = "Graphical Ontotlogy Editor") -> None:
         self.window = Tk()
         self.tabs = []
+        self.pending_refresh: Set[ttk.Frame] = set()
+        self.connected = False
         self.window.resizable(False, False)
         self.notebook = ttk.Notebook(self.window, width=1080)
         self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
@@ -35,11 +44,91 @@ class OntotlogyEditor:
 
         self.configure_menu()
         self.init_tabs()
+        self.configure_status_bar()
+        self.worker = BackgroundWorker(self.window, on_busy=self.set_busy, on_error=self.show_error)
+        self.worker.submit(self.traced("Startup", self.warm_up), self.show_warm_up, self.connection_failed, key="refresh")
         self.configure_window()
+        self.stale_tabs.discard(self.class_tab)
+        self.pending_refresh.add(self.class_tab)
+
+    def warm_up(self):
+        database.connect()
+        return self.update_data(self.class_tab)
+
+    def show_warm_up(self, data):
+        self.show_tables_data([(self.get_tabs([self.class_tab])[0], data)])
+
+    def connection_failed(self, error: Exception):
+        self.pending_refresh.discard(self.class_tab)
+        self.stale_tabs.add(self.class_tab)
+        self.show_error(error)
 
     def on_tab_changed(self, event):
         selected_tab = event.widget.select()
         self.tab_index = event.widget.index(selected_tab)
+        stale = [i for i in self.tabs if str(i.tab) == selected_tab and i.tab in self.stale_tabs]
+        if stale:
+            self.refresh_tables(stale)
+
+    def is_visible(self, tab: ttk.Frame) -> bool:
+        return str(tab) == self.notebook.select()
+
+    def configure_status_bar(self):
+        self.status_bar = ttk.Frame(self.window)
+        self.status_bar.pack(fill="x", side="bottom")
+        self.status_label = ttk.Label(self.status_bar, text="")
+        self.status_label.pack(side="left", padx=5)
+        self.progress = ttk.Progressbar(self.status_bar, mode="indeterminate", length=150)
+        self.progress.pack(side="right", padx=5, pady=2)
+
+    def set_busy(self, busy: bool):
+        if busy:
+            self.status_label.config(text="Working..." if self.connected else "Connecting...")
+            self.progress.start(10)
+        else:
+            self.status_label.config(text="")
+            self.progress.stop()
+
+    def show_error(self, error: Exception):
+        messagebox.showwarning("Warning", getattr(error, "message", None) or str(error))
+
+    def get_tabs(self, frames: Optional[List[ttk.Frame]] = None) -> List[Tab]:
+        if frames is None:
+            return self.tabs
+        return [i for i in self.tabs if i.tab in frames]
+
+    def run_mutation(
+        self,
+        action: Callable[[], Optional[str]],
+        tabs: Optional[List[ttk.Frame]] = None,
+        refresh_on_warning: bool = False,
+        name: str = "Edit",
+    ):
+        def done(warning: Optional[str]):
+            if warning:
+                messagebox.showwarning("Warning", warning)
+            if not warning or refresh_on_warning:
+                self.refresh_tables(self.get_tabs(tabs))
+
+        self.worker.submit(self.traced(name, action), done)
+
+    def traced(self, name: str, func: Callable[[], Any]) -> Callable[[], Any]:
+        def run():
+            with database.tracer.action(name):
+                return func()
+        return run
+
+    def completer(self, *kinds: str) -> Callable[[str], List[str]]:
+        """Completions of the given kinds from the name index, once it is loaded."""
+        def complete(prefix: str) -> List[str]:
+            if not database.name_index.loaded:
+                return []
+            return database.name_index.complete(prefix, kinds, settings.AUTOCOMPLETE_LIMIT)
+        return complete
+
+    def load_name_index(self):
+        if not database.name_index.loaded:
+            self.worker.submit(database.get_name_index, key="name_index")
 
     def configure_menu(self):
         self.menu = tk.Menu()
@@ -47,13 +136,74 @@ class OntotlogyEditor:
         self.sub_menu.add_command(
             label="Upload", accelerator="Ctrl+N", command=self.browse_file
         )
+        self.sub_menu.add_command(
+            label="Import Table", command=self.import_table
+        )
+        self.sub_menu.add_command(
+            label="Export", command=self.export
+        )
+        self.sub_menu.add_command(
+            label="Bulk Rename", command=self.bulk_rename_window
+        )
         self.sub_menu.add_command(
             label="Delete All", command=self.delete_all
         )
+        self.sub_menu.add_command(
+            label="Cache Statistics", command=self.show_cache_stats
+        )
+        self.sub_menu.add_command(
+            label="Performance", command=self.show_performance
+        )
         self.window.bind('<Control-n>', self.browse_file)
         self.menu.add_cascade(menu=self.sub_menu, label="Menu")
         self.window.config(menu=self.menu)
 
+    def show_cache_stats(self):
+        stats = database.query_cache.stats()
+        messagebox.showinfo("Cache Statistics", "\n".join(f"{key}: {value}" for key, value in stats.items()))
+
+    def show_performance(self):
+        performance_window = tk.Toplevel(self.window)
+        performance_window.title("Performance")
+        summary = ttk.Label(performance_window, text="")
+        summary.grid(row=0, column=0, padx=5, pady=5, sticky="w")
+
+        columns = {
+            "function": ['Function', 'Queries', 'p50, ms', 'p95, ms', 'Rows', 'KB'],
+            "action": ['Action', 'Runs', 'p50, ms', 'p95, ms', 'Queries', 'Rows'],
+        }
+        sheets = {}
+        for row, key in enumerate(columns, start=1):
+            sheet = Sheet(performance_window, height=300, width=900, default_column_width=140)
+            sheet.enable_bindings()
+            sheet.headers(columns[key])
+            sheet.grid(row=row, column=0, sticky="nswe")
+            sheets[key] = sheet
+
+        def update():
+            try:
+                if not performance_window.winfo_exists():
+                    return
+            except TclError:
+                return
+            sheets["function"].set_sheet_data([
+                [i["name"], i["count"], round(i["p50"] * 1000, 1), round(i["p95"] * 1000, 1), i["rows"],
+                 round(i["bytes"] / 1024, 1)]
+                for i in database.tracer.function_stats()
+            ])
+            sheets["action"].set_sheet_data([
+                [i["name"], i["count"], round(i["p50"] * 1000, 1), round(i["p95"] * 1000, 1), i["queries"], i["rows"]]
+                for i in database.tracer.action_stats()
+            ])
+            cache = database.query_cache.stats()
+            summary.config(
+                text=f"Recorded queries: {len(database.tracer.records)}    "
+                     f"Cache hits: {cache['hits']}    Cache misses: {cache['misses']}"
+            )
+            performance_window.after(1000, update)
+
+        update()
+
     def browse_file(self, *args):
         filename = filedialog.askopenfilename(
             initialdir="/home/konstantin/",
@@ -61,14 +211,110 @@ class OntotlogyEditor:
             filetypes=(("Rdf files", "*.rdf*"), ("all files", "*.*")),
         )
         if filename:
-            write_file(filename)
-            self.refresh_tables(self.tabs)
+            self.run_mutation(lambda: None if write_file(filename) else "Check input args.", name="Upload")
+
+    def import_table(self):
+        filename = filedialog.askopenfilename(
+            title="Select a Table",
+            filetypes=(("Tables", "*.csv *.tsv *.tab"), ("all files", "*.*")),
+        )
+        if not filename:
+            return
+
+        def load():
+            header, rows = importer.read_table(filename)
+            return header, rows, importer.get_properties()
+
+        self.worker.submit(self.traced("Import", load), lambda data: self.import_mapping_window(*data))
+
+    def import_mapping_window(self, header: List[str], rows: List[List[str]], properties: Dict[str, Any]):
+        if not header:
+            messagebox.showwarning("Warning", "The table is empty.")
+            return
+        import_window = tk.Toplevel(self.window)
+        import_window.title(f"Import {len(rows)} rows")
+        choices = [importer.SKIP, importer.NAME, importer.CLASS, *sorted(properties)]
+        boxes = []
+        for row, (column, guess) in enumerate(zip(header, importer.guess_mapping(header, properties))):
+            ttk.Label(import_window, text=column).grid(row=row, column=0, padx=5, pady=2, sticky="w")
+            box = ttk.Combobox(import_window, values=choices, state="readonly")
+            box.set(guess)
+            box.grid(row=row, column=1, padx=5, pady=2, sticky="ew")
+            boxes.append(box)
+
+        ttk.Label(import_window, text="Default Class").grid(row=len(header), column=0, padx=5, pady=2, sticky="w")
+        default_class = ttk.Entry(import_window)
+        default_class.grid(row=len(header), column=1, padx=5, pady=2, sticky="ew")
+        progress = ttk.Progressbar(import_window, mode="determinate", maximum=max(1, len(rows)))
+        progress.grid(row=len(header) + 1, column=0, columnspan=2, padx=5, pady=5, sticky="ew")
+
+        def submit():
+            mapping = [i.get() for i in boxes]
+            import_button.config(state="disabled")
+            job = CancellableJob(
+                self.window,
+                done,
+                failed,
+                lambda elapsed, imported: progress.config(value=imported),
+            )
+            job.start(self.traced("Import", lambda: importer.import_rows(
+                rows, mapping, default_class.get().strip() or None, lambda imported, total: job.report(imported),
+            )))
+
+        def done(report: importer.ImportReport):
+            import_window.destroy()
+            self.refresh_tables(self.get_tabs([self.individual_tab, self.object_property_tab, self.data_property_tab]))
+            if report.errors:
+                self.show_import_errors(report)
+            else:
+                messagebox.showinfo("Import", f"Imported {report.imported} individuals.")
+
+        def failed(error: Exception):
+            import_button.config(state="normal")
+            self.show_error(error)
+
+        import_button = ttk.Button(import_window, text="Import", command=submit)
+        import_button.grid(row=len(header) + 2, column=0, columnspan=2, padx=5, pady=5, sticky="ew")
+
+    def show_import_errors(self, report: importer.ImportReport):
+        errors_window = tk.Toplevel(self.window)
+        errors_window.title(f"Imported {report.imported} individuals, {len(report.errors)} rows failed")
+        sheet = Sheet(errors_window, data=[list(i) for i in report.errors], height=400, width=900)
+        sheet.column_width(column=0, width=80)
+        sheet.column_width(column=1, width=780)
+        sheet.enable_bindings()
+        sheet.headers(['Line', 'Error'])
+        sheet.grid(row=0, column=0, sticky="nswe")
+
+    def export(self, class_name: Optional[str] = None):
+        filename = filedialog.asksaveasfilename(
+            title="Export" if class_name is None else f"Export {class_name}",
+            initialfile=f"{class_name or 'ontology'}.rdf",
+            filetypes=(("Rdf files", "*.rdf"), ("Turtle files", "*.ttl"), ("N-Triples files", "*.nt")),
+        )
+        if not filename:
+            return
+        format = filename.rsplit(".", 1)[-1].lower()
+        if format not in database.EXPORT_FORMATS:
+            messagebox.showwarning("Warning", "Choose a .rdf, .ttl or .nt file.")
+            return
+        def done(_):
+            messagebox.showinfo("Export", f"Saved {filename}.")
+
+        self.worker.submit(self.traced("Export", lambda: database.export_statements(filename, format, class_name)), done)
+
+    def export_selected_class(self, tab: Tab):
+        selected_cells = tab.sheet.get_selected_cells()
+        if len(selected_cells) != 1:
+            messagebox.showwarning("Warning", "Select one class.")
+            return
+        self.export(tab.sheet.get_cell_data(*next(iter(selected_cells))))
 
     def update_data_class(self):
         content = []
         query_result = database.execute_get_query(relation="rdf:type", object="owl:Class")
         for item in query_result:
-            content.append(item["subject"].split("/")[-1][:-1])
+            content.append(item.subject.name)
 
         return content
 
@@ -76,7 +322,7 @@ class OntotlogyEditor:
         content = []
         query_result = database.execute_get_individuals_query()
         for item in query_result:
-            content.append(item["subject"].split("/")[-1][:-1])
+            content.append(item.subject.name)
 
         return content
 
@@ -89,47 +335,27 @@ class OntotlogyEditor:
 
         return content
 
-    def update_data_object_property(self):
-        content = []
-
-        query_result = database.execute_get_query(
-            relation="rdf:type", object="owl:ObjectProperty"
-        )
-        for item in query_result:
-            dict_item = {}
-            for i in database.execute_get_query():
-                if i["subject"].split("/")[-1][:-1] == item["subject"].split("/")[-1][:-1]:
-                    if i["relation"].split("#")[1][:-1] == 'type':
-                        dict_item['subject'] = item["subject"].split("/")[-1][:-1]
-                    elif i["relation"].split("#")[1][:-1] == 'domain':
-                        dict_item['relation'] = i["object"].split("/")[-1][:-1]
-                    else:
-                        dict_item['object'] = i["object"].split("/")[-1][:-1]
-            content.append(dict_item.copy())
-            dict_item.clear()
+    def collect_properties(self, property_type: str):
+        content: Dict[str, Dict[str, Any]] = {}
 
-        return self.handle_data_in_dict_output(content)
+        for item in database.get_properties(property_type):
+            name = item.property.name
+            dict_item = content.setdefault(name, {'subject': name})
+            if item.domain is not None:
+                dict_item['relation'] = item.domain.name
+            if item.range is not None:
+                if property_type == 'owl:DatatypeProperty':
+                    dict_item['object'] = 'xsd:' + item.range.name
+                else:
+                    dict_item['object'] = item.range.name
 
-    def update_data_property(self):
-        content = []
+        return self.handle_data_in_dict_output(list(content.values()))
 
-        query_result = database.execute_get_query(
-            relation="rdf:type", object="owl:DatatypeProperty"
-        )
-        for item in query_result:
-            dict_item = {}
-            for i in database.execute_get_query():
-                if i["subject"].split("/")[-1][:-1] == item["subject"].split("/")[-1][:-1]:
-                    if i["relation"].split("#")[1][:-1] == 'type':
-                        dict_item['subject'] = item["subject"].split("/")[-1][:-1]
-                    elif i["relation"].split("#")[1][:-1] == 'domain':
-                        dict_item['relation'] = i["object"].split("/")[-1][:-1]
-                    else:
-                        dict_item['object'] = 'xsd:' + i["object"].split("#")[1][:-1]
-            content.append(dict_item.copy())
-            dict_item.clear()
+    def update_data_object_property(self):
+        return self.collect_properties('owl:ObjectProperty')
 
-        return self.handle_data_in_dict_output(content)
+    def update_data_property(self):
+        return self.collect_properties('owl:DatatypeProperty')
 
     def update_subclasses(self):
         content = []
@@ -137,8 +363,7 @@ class OntotlogyEditor:
         query_result = database.execute_get_query(relation="rdfs:subClassOf")
 
         for item in query_result:
-            content.append([item["object"].split("/")[-1][:-1],
-                            item["subject"].split("/")[-1][:-1]])
+            content.append([item.object.name, item.subject.name])
 
         return content
 
@@ -154,35 +379,56 @@ class OntotlogyEditor:
         elif tab == self.subclass_tab:
             return self.update_subclasses()
 
-    def update_tab_sheet(self, tab: ttk.Frame, sheet: Sheet):
-        for i in self.tabs:
-            if tab == i.tab:
-                i.sheet = sheet
-                break
+    def load_tables_data(self, tabs: List[Tab]):
+        with database.session():
+            return [(i, self.update_data(i.tab)) for i in tabs if i.tab != self.query]
 
     def refresh_tables(self, tabs: List[Tab]):
-        for i in tabs:
-            if i.tab == self.query:
-                continue
-            data = self.update_data(i.tab)
-            if not data:
-                data = ''
-            sheet = Sheet(
-                i.tab,
-                data=data,
-                height=700,
-                width=1020,
-                default_column_width=300
-                )
-            sheet.enable_bindings()
-            sheet.extra_bindings("begin_edit_cell", self.begin_edit_cell)
-            if i == self.subclass_tab:
-                span = sheet.span(key=self.just_tabs[i.tab], header=True)
-                sheet.readonly(span)
-            sheet.edit_validation(self.validate_edits)
-            sheet.grid(row=0, column=1, sticky="nswe")
-            sheet.headers(i.tab_name)
-            self.update_tab_sheet(i.tab, sheet)
+        tabs = [i for i in tabs if i.tab != self.query]
+        self.stale_tabs.update(i.tab for i in tabs if not self.is_visible(i.tab))
+        self.pending_refresh.update(i.tab for i in tabs if self.is_visible(i.tab))
+        if not self.pending_refresh:
+            return
+        pending = self.get_tabs(list(self.pending_refresh))
+        self.worker.submit(
+            self.traced("Refresh", lambda: self.load_tables_data(pending)), self.show_tables_data, key="refresh"
+        )
+
+    def show_tables_data(self, tabs_data):
+        self.connected = True
+        for i, data in tabs_data:
+            self.pending_refresh.discard(i.tab)
+            self.stale_tabs.discard(i.tab)
+            self.apply_rows(i, data or [])
+
+    def apply_rows(self, tab: Tab, rows: List[List[Any]]):
+        old_rows = tab.sheet.get_sheet_data()
+        remaining = Counter(tuple(i) for i in rows)
+        removed = []
+        for index, row in enumerate(old_rows):
+            if remaining[tuple(row)] > 0:
+                remaining[tuple(row)] -= 1
+            else:
+                removed.append(index)
+        added = []
+        for row in rows:
+            if remaining[tuple(row)] > 0:
+                remaining[tuple(row)] -= 1
+                added.append(row)
+
+        if not removed and not added:
+            return
+        if not old_rows or len(removed) + len(added) > len(rows):
+            tab.sheet.set_sheet_data(rows)
+            return
+        renamed = min(len(removed), len(added))
+        for index, row in zip(removed, added):
+            tab.sheet.set_row_data(index, row, redraw=False)
+        if len(removed) > renamed:
+            tab.sheet.del_rows(removed[renamed:], redraw=False)
+        if len(added) > renamed:
+            tab.sheet.insert_rows(added[renamed:], redraw=False)
+        tab.sheet.redraw()
 
     def init_tabs(self):
         self.class_tab = ttk.Frame(self.notebook)
@@ -213,13 +459,10 @@ class OntotlogyEditor:
             self.subclass_tab: ['Parent', 'Child'],
             self.query: ['Subject', 'Relation', 'Object']
         }
+        self.stale_tabs = {i for i in self.just_tabs if i != self.query}
         for i in self.just_tabs.keys():
-            data = self.update_data(i)
-            if not data:
-                data = ''
             sheet = Sheet(
                 i,
-                data=data,
                 height=700 if i != self.query else 500,
                 width=1020 if i != self.query else 1080,
                 default_column_width=300 if i != self.query else 360
@@ -250,8 +493,21 @@ class OntotlogyEditor:
         query_text = tk.Text(tool_frame, width=133, height=8)
         query_text.grid(row=1, padx=5, pady=5, sticky="ew")
 
-        create_button = ttk.Button(tool_frame, text="Execute", command=lambda: self.execute_query(query_text))
-        create_button.grid(row=2, padx=5, pady=5, sticky="ew")
+        button_frame = ttk.Frame(tool_frame)
+        button_frame.grid(row=2, padx=5, pady=5, sticky="ew")
+        button_frame.grid_columnconfigure(0, weight=1)
+        create_button = ttk.Button(button_frame, text="Execute", command=lambda: self.execute_query(query_text))
+        create_button.grid(row=0, column=0, sticky="ew")
+        self.cancel_button = ttk.Button(button_frame, text="Cancel", command=self.cancel_query, state="disabled")
+        self.cancel_button.grid(row=0, column=1, padx=(5, 0))
+
+        self.query_status = ttk.Label(tool_frame, text="")
+        self.query_status.grid(row=3, padx=5, sticky="w")
+        self.query_job: Optional[CancellableJob] = None
+        self.query_generation = 0
+        self.query_more = False
+        self.query_loading = False
+        self.window.after(200, self.watch_query_scroll)
 
     def parse_query(self, query: str) -> List[str]:
         pattern = re.compile(r'\?(\w+)\b')
@@ -260,59 +516,146 @@ class OntotlogyEditor:
         return list(dict.fromkeys(variables))
 
     def execute_query(self, query: tk.Text):
-        query_text = query.get("1.0", tk.END)
-        variables = self.parse_query(query=query_text)
-        data = database.execute_raw_query(query_text)
-        if isinstance(data, bool):
-            self.refresh_tables(self.tabs)
-            return
-        elif isinstance(data, str):
-            messagebox.showwarning("Warning", data)
+        if self.query_job is not None:
+            self.query_job.cancel()
+        self.query_text = query.get("1.0", tk.END)
+        self.query_variables = self.parse_query(query=self.query_text)
+        self.query_generation += 1
+        self.query_rows = 0
+        self.query_more = False
+        self.fetch_query_page()
+
+    def fetch_query_page(self):
+        self.query_loading = True
+        generation, offset = self.query_generation, self.query_rows
+        query_text, limit, timeout = self.query_text, settings.QUERY_PAGE_SIZE, settings.QUERY_TIMEOUT
+        job = self.query_job = CancellableJob(
+            self.window,
+            lambda data: self.show_query_data(generation, data),
+            self.query_failed,
+            self.show_query_progress,
+            timeout=timeout,
+        )
+        self.cancel_button.config(state="normal")
+        job.start(self.traced("Query", lambda: self.load_query_data(
+            query_text, limit, offset, timeout, job.cancelled, job.report,
+        )))
+
+    def show_query_progress(self, elapsed: float, rows: int):
+        self.query_status.config(text=f"Running... {elapsed:.1f} s, {self.query_rows + rows} rows")
+
+    def cancel_query(self):
+        if self.query_job is None:
             return
+        self.query_job.cancel()
+        self.query_finished()
+        self.query_more = False
+        self.query_status.config(text=f"{self.query_rows} rows (cancelled)")
+
+    def query_finished(self):
+        self.query_job = None
+        self.query_loading = False
+        self.cancel_button.config(state="disabled")
+
+    def query_failed(self, error: Exception):
+        self.query_finished()
+        self.query_more = False
+        self.query_status.config(text=f"{self.query_rows} rows")
+        self.show_error(error)
+
+    def watch_query_scroll(self):
+        try:
+            if self.query_more and not self.query_loading and self.is_visible(self.query):
+                sheet = self.get_tabs([self.query])[0].sheet
+                if sheet.get_yview()[1] >= 0.9:
+                    self.fetch_query_page()
+        finally:
+            self.window.after(200, self.watch_query_scroll)
+
+    def load_query_data(
+        self,
+        query_text: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        timeout: Optional[float] = None,
+        cancelled: Optional[threading.Event] = None,
+        progress: Optional[Callable[[int], None]] = None,
+    ):
+        data = database.execute_raw_query(query_text, limit, offset, timeout, cancelled, progress)
+        if isinstance(data, (bool, str)):
+            return data
         data_list = []
         for i in data:  # type: ignore
             values = list(i.values())
             data_list.append([])
             for j in values:
-                try:
-                    item = j.uri.split("#")[1]
-                except AttributeError:
+                if j is None:
+                    item = None
+                elif j.name == "" and j.namespace:
+                    item = j.namespace.rstrip("/#").split("/")[-1]
+                else:
                     item = j.label
-                except Exception:
-                    item = j.uri.split("/")[-1]
-                if not item:
-                    item = j.uri.split("/")[-2]
                 data_list[-1].append(item)
-        sheet = Sheet(
-            self.query,
-            data=data_list,
-            height=500,
-            width=1080,
-            default_column_width=360
-            )
-        sheet.enable_bindings()
-        span = sheet.span(key=self.just_tabs[self.query], header=True)
-        sheet.readonly(span)
-        sheet.grid(row=1, column=0, sticky="nswe")
-        sheet.headers(variables)
-        self.update_tab_sheet(self.query, sheet)
+        return data_list
+
+    def show_query_data(self, generation: int, data_list):
+        if generation != self.query_generation:
+            return
+        self.query_finished()
+        if isinstance(data_list, bool):
+            self.query_status.config(text="")
+            self.refresh_tables(self.tabs)
+            return
+        elif isinstance(data_list, str):
+            self.query_status.config(text="")
+            messagebox.showwarning("Warning", data_list)
+            return
+        sheet = self.get_tabs([self.query])[0].sheet
+        if self.query_rows == 0:
+            sheet.set_sheet_data(data_list, redraw=False)
+            sheet.headers(self.query_variables)
+        elif data_list:
+            sheet.insert_rows(data_list, redraw=False)
+        sheet.redraw()
+
+        self.query_rows += len(data_list)
+        paged = database.is_pageable(self.query_text)
+        self.query_more = paged and len(data_list) == settings.QUERY_PAGE_SIZE
+        if self.query_more and self.query_rows >= settings.QUERY_MAX_ROWS:
+            self.query_more = False
+            self.query_status.config(text=f"{self.query_rows} rows (row limit reached)")
+        elif self.query_more:
+            self.query_status.config(text=f"{self.query_rows} rows (scroll for more)")
+        else:
+            self.query_status.config(text=f"{self.query_rows} rows")
 
     def begin_edit_cell(self, event=None):
         self.old_cell_value = event.value  # type: ignore
         return event.value  # type: ignore
 
     def validate_edits(self, event):
+        old_name, new_name = self.old_cell_value, event.value
         if self.tab_index == 0:
-            database.rename_subject_object(old_name=self.old_cell_value, new_name=event.value)
+            rename = database.rename_subject_object
+            tabs = [self.class_tab, self.object_property_tab, self.data_property_tab, self.subclass_tab]
         elif self.tab_index == 1:
-            database.rename_subject_object(old_name=self.old_cell_value, new_name=event.value)
+            rename = database.rename_subject_object
+            tabs = [self.individual_tab]
         elif self.tab_index == 2:
-            database.rename_relation(old_name=self.old_cell_value, new_name=event.value)
+            rename = database.rename_relation
+            tabs = [self.object_property_tab]
         elif self.tab_index == 3:
-            database.rename_relation(old_name=self.old_cell_value, new_name=event.value)
+            rename = database.rename_relation
+            tabs = [self.data_property_tab]
+        else:
+            return event.value
 
-        self.refresh_tables(self.tabs)
+        def action():
+            if database.name_term(new_name) is None:
+                return f"Invalid name {new_name!r}."
+            rename(old_name=old_name, new_name=new_name)
 
+        self.run_mutation(action, tabs, refresh_on_warning=True, name="Rename")
         return event.value
 
     def _setup_tools(self, tab: Tab):
@@ -330,6 +673,10 @@ class OntotlogyEditor:
                                                  command=lambda: self.delete_individual_property_form(tab.tab))
             connect_property_button.grid(row=4, padx=5, pady=5, sticky="ew")
 
+        if tab.tab == self.class_tab:
+            export_button = ttk.Button(tool_frame, text="Export", command=lambda: self.export_selected_class(tab))
+            export_button.grid(row=4, padx=5, pady=5, sticky="ew")
+
         if tab.tab == self.individual_tab:
             individual_info = ttk.Button(tool_frame, text="Individual Info", command=lambda: self.search_window(tab))
             individual_info.grid(row=4, padx=5, pady=5, sticky="ew")
@@ -337,18 +684,23 @@ class OntotlogyEditor:
             individual_info.grid(row=5, padx=5, pady=5, sticky="ew")
 
     def create(self, tab: ttk.Frame, data: Dict[str, str]):
-        if tab == self.class_tab:
-            self.create_class(data)
-        elif tab == self.individual_tab:
-            self.create_individual(data)
-        elif tab == self.object_property_tab:
-            self.create_object_property(data)
-        elif tab == self.data_property_tab:
-            self.create_data_property(data)
-        elif tab == self.subclass_tab:
-            return self.create_subclass(data)
+        invalid = [i for key, i in data.items() if key != 'xs_range' and database.name_term(i) is None]
+        if invalid:
+            return f"Invalid name {invalid[0]!r}."
+        with database.session():
+            if tab == self.class_tab:
+                return self.create_class(data)
+            elif tab == self.individual_tab:
+                return self.create_individual(data)
+            elif tab == self.object_property_tab:
+                return self.create_object_property(data)
+            elif tab == self.data_property_tab:
+                return self.create_data_property(data)
+            elif tab == self.subclass_tab:
+                return self.create_subclass(data)
 
     def create_form_window(self, tab: ttk.Frame):
+        self.load_name_index()
         self.form_window = Tk()
         self.form_window.title("Create Form")
         self.label_entry = []
@@ -363,7 +715,7 @@ class OntotlogyEditor:
             self.form_window.geometry("500x300")
             label = ttk.Label(self.form_window, text="Class Name")
             label.place(relx=0.5, rely=0.1, anchor=CENTER)
-            entry = ttk.Entry(self.form_window)
+            entry = AutocompleteEntry(self.form_window, self.completer("Class"))
             entry.place(relx=0.5, rely=0.25, anchor=CENTER)
             self.label_entry.append(entry)
             label = ttk.Label(self.form_window, text="Individual Name")
@@ -380,24 +732,27 @@ class OntotlogyEditor:
             self.label_entry.append(entry)
             label = ttk.Label(self.form_window, text="Domain Name 1")
             label.place(relx=0.5, rely=0.3, anchor=CENTER)
-            entry = ttk.Entry(self.form_window)
+            entry = AutocompleteEntry(self.form_window, self.completer("Class"))
             entry.place(relx=0.5, rely=0.4, anchor=CENTER)
             self.label_entry.append(entry)
             label = ttk.Label(self.form_window, text="Domain Name 2" if tab == self.object_property_tab else "Range")
             label.place(relx=0.5, rely=0.5, anchor=CENTER)
-            entry = ttk.Entry(self.form_window)
+            if tab == self.object_property_tab:
+                entry = AutocompleteEntry(self.form_window, self.completer("Class"))
+            else:
+                entry = ttk.Entry(self.form_window)
             entry.place(relx=0.5, rely=0.6, anchor=CENTER)
             self.label_entry.append(entry)
         elif tab == self.subclass_tab:
             self.form_window.geometry("500x300")
             label = ttk.Label(self.form_window, text="Class Name")
             label.place(relx=0.5, rely=0.1, anchor=CENTER)
-            entry = ttk.Entry(self.form_window)
+            entry = AutocompleteEntry(self.form_window, self.completer("Class"))
             entry.place(relx=0.5, rely=0.25, anchor=CENTER)
             self.label_entry.append(entry)
             label = ttk.Label(self.form_window, text="Subclass Name")
             label.place(relx=0.5, rely=0.4, anchor=CENTER)
-            entry = ttk.Entry(self.form_window)
+            entry = AutocompleteEntry(self.form_window, self.completer("Class"))
             entry.place(relx=0.5, rely=0.55, anchor=CENTER)
             self.label_entry.append(entry)
 
@@ -410,33 +765,29 @@ class OntotlogyEditor:
                 data = {
                     'classname': self.label_entry[0].get()
                 }
-                self.create(tab, data)
             elif tab == self.individual_tab:
                 data = {
                     'instance_name': self.label_entry[1].get(),
                     'instance_type': self.label_entry[0].get()
                 }
-                self.create(tab, data)
             elif tab == self.object_property_tab:
                 data = {
                     'object_property': self.label_entry[0].get(),
                     'domain_1': self.label_entry[1].get(),
                     'domain_2': self.label_entry[2].get()
                 }
-                self.create(tab, data)
             elif tab == self.data_property_tab:
                 data = {
                     'data_property': self.label_entry[0].get(),
                     'domain': self.label_entry[1].get(),
                     'xs_range': self.label_entry[2].get()
                 }
-                self.create(tab, data)
             elif tab == self.subclass_tab:
                 data = {
                     'classname': self.label_entry[1].get(),
                     'parent': self.label_entry[0].get()
                 }
-                self.create(tab, data)
+            self.run_mutation(lambda: self.create(tab, data), None if tab == self.subclass_tab else [tab], name="Create")
         except TclError:
             messagebox.showwarning("Warning", "Check input args, maybe some of them are empty.")
         finally:
@@ -447,9 +798,8 @@ class OntotlogyEditor:
             'Class': data['classname'],
         })
         if validation['Class']:
-            return
+            return "Such class already exists."
         database.execute_post_query(f"<{data['classname']}>", "rdf:type", "owl:Class")
-        self.refresh_tables(self.tabs)
 
     def create_individual(self, data: Dict[str, str]):
         validation = validate_input({
@@ -457,123 +807,96 @@ class OntotlogyEditor:
             'Class': data['instance_type']
         })
         if validation['NamedIndividual'] or not validation['Class']:
-            messagebox.showwarning("Warning", "Check input args.")
-            return
-        if database.execute_post_query(
-            f"<{data['instance_name']}>", "rdf:type", "owl:NamedIndividual"
-        ):
-            database.execute_post_query(
-                f"<{data['instance_name']}>", "rdf:type", f"<{data['instance_type']}>"
-            )
-            self.refresh_tables(self.tabs)
+            return "Check input args."
+        if not database.execute_post_many([
+            (f"<{data['instance_name']}>", "rdf:type", "owl:NamedIndividual"),
+            (f"<{data['instance_name']}>", "rdf:type", f"<{data['instance_type']}>"),
+        ]):
+            return "Changes were rolled back."
 
     def create_object_property(self, data: Dict[str, str]):
         validation = validate_input({
             'ObjectProperty': data['object_property'],
         })
         if validation['ObjectProperty']:
-            messagebox.showwarning("Warning", "Check input args.")
-            return
+            return "Check input args."
         if not check_class_existing(data['domain_1']) or not check_class_existing(data['domain_2']):
-            messagebox.showwarning("Warning", "Such class doesn't exist.")
-            return
-        if (
-            database.execute_post_query(
-                f"<{data['object_property']}>", "rdf:type", "owl:ObjectProperty"
-            )
-            and database.execute_post_query(
-                f"<{data['object_property']}>", "rdfs:domain", f"<{data['domain_1']}>"
-            )
-            and database.execute_post_query(
-                f"<{data['object_property']}>", "rdfs:range", f"<{data['domain_2']}>"
-            )
-        ):
-            self.refresh_tables(self.tabs)
+            return "Such class doesn't exist."
+        if not database.execute_post_many([
+            (f"<{data['object_property']}>", "rdf:type", "owl:ObjectProperty"),
+            (f"<{data['object_property']}>", "rdfs:domain", f"<{data['domain_1']}>"),
+            (f"<{data['object_property']}>", "rdfs:range", f"<{data['domain_2']}>"),
+        ]):
+            return "Changes were rolled back."
 
     def create_data_property(self, data: Dict[str, str]):
         allows_range = ["xsd:decimal", "xsd:int", "xsd:string"]
         if data['xs_range'] not in allows_range:
-            messagebox.showwarning("Warning", "Check input args.")
-            return
+            return "Check input args."
         validation = validate_input({
             'DatatypeProperty': data['data_property'],
             'Class': data['domain']
         })
         if not validation['Class']:
-            messagebox.showwarning("Warning", "Check input args.")
-            return
+            return "Check input args."
         if validation['DatatypeProperty']:
-            messagebox.showwarning("Warning", "Check input args.")
-            return
-        if (
-            database.execute_post_query(
-                f"<{data['data_property']}>", "rdf:type", "owl:DatatypeProperty"
-            )
-            and database.execute_post_query(
-                f"<{data['data_property']}>", "rdfs:domain", f"<{data['domain']}>"
-            )
-            and database.execute_post_query(
-                f"<{data['data_property']}>", "rdfs:range", f"{data['xs_range']}"
-            )
-        ):
-            self.refresh_tables(self.tabs)
+            return "Check input args."
+        if not database.execute_post_many([
+            (f"<{data['data_property']}>", "rdf:type", "owl:DatatypeProperty"),
+            (f"<{data['data_property']}>", "rdfs:domain", f"<{data['domain']}>"),
+            (f"<{data['data_property']}>", "rdfs:range", f"{data['xs_range']}"),
+        ]):
+            return "Changes were rolled back."
 
     def create_subclass(self, data: Dict[str, str]):
         parent_class = check_class_existing(data['parent'])
         child_class = check_class_existing(data['classname'])
         if not parent_class:
-            messagebox.showwarning("Warning", "uch parent class doesn't exist.")
-            return
-        if not child_class:
-            database.execute_post_query(f"<{data['classname']}>", "rdf:type", "owl:Class")
-        else:
+            return "Such parent class doesn't exist."
+        if child_class:
             self.delete_class(data['classname'])
-            database.execute_post_query(f"<{data['classname']}>", "rdf:type", "owl:Class")
-        if database.execute_post_query(f"<{data['classname']}>", "rdfs:subClassOf", f"<{data['parent']}>"):
-            self.refresh_tables(self.tabs)
+        if not database.execute_post_many([
+            (f"<{data['classname']}>", "rdf:type", "owl:Class"),
+            (f"<{data['classname']}>", "rdfs:subClassOf", f"<{data['parent']}>"),
+        ]):
+            return "Changes were rolled back."
 
     def get_individual_info(self, individual: str):
-        content = []
-        validation = validate_input({
-            'NamedIndividual': individual,
-        })
-        if not validation['NamedIndividual']:
+        return self.individual_info_rows(individual, database.get_individuals_info([individual]).get(individual, []))
+
+    def individual_info_rows(self, individual: str, triples: List[TripleRow]):
+        content: List[Dict[str, Any]] = []
+        if not triples:
             return content
 
-        query_result = database.execute_get_individuals_query(name=individual)
-        for item in query_result:
-            subject = item["subject"].split("/")[-1][:-1]
-            item_dict = {
-                'subject': subject,
+        individual_class = None
+        for item in triples:
+            if item.relation.text == database.RDF_TYPE:
+                if individual_class is None and item.object.namespace != database.PREFIXES["owl"]:
+                    individual_class = item.object.name
+                continue
+            item_dict: Dict[str, Any] = {
+                'subject': item.subject.name,
             }
-            relation = item["relation"].split("/")[-1][:-1]
-            if len(item["object"].split("^^")) == 2:
+            relation = item.relation.name
+            object: Any
+            if item.object.datatype is not None:
                 try:
-                    object = float(item["object"].split("^^")[0][1:-1])
+                    object = float(item.object.label)
                 except Exception:
-                    object = item["object"].split("^^")[0]
+                    object = f'"{item.object.value}"'
                 item_dict.update({
                     'relation': relation,
                     'object': object
                 })
             else:
-                object = item["object"].split("/")[-1][:-1]
+                object = item.object.name
                 item_dict.update({
                     'relation': relation,
                     'object': object
                 })
             content.append(item_dict)
 
-        individual_class = None
-        for i in database.execute_get_query():
-            try:
-                if i["subject"].split("/")[-1][:-1] == individual and \
-                   not i["object"].split("/")[-1][:-1].startswith('owl') and \
-                   i["relation"].split("#")[1][:-1] == 'type':
-                    individual_class = i["object"].split("/")[-1][:-1]
-                    break
-            except IndexError:
-                pass
         content.append({
             'subject': individual,
             'relation': 'type',
@@ -583,11 +906,21 @@ class OntotlogyEditor:
         return self.handle_data_in_dict_output(content)
 
     def find_individual(self, individuals_name: List[str]):
+        self.worker.submit(
+            self.traced("Search", lambda: self.load_individuals_info(individuals_name)),
+            self.show_individuals_info,
+            key="search",
+        )
+
+    def load_individuals_info(self, individuals_name: List[str]):
+        data = []
+        for name, triples in database.get_individuals_info(individuals_name).items():
+            data.extend(self.individual_info_rows(name, triples))
+        return data
+
+    def show_individuals_info(self, data: List[List[Any]]):
         individual_window = tk.Toplevel(self.window)
         individual_window.title("Individual Info")
-        data = []
-        for i in individuals_name:
-            data.extend(self.get_individual_info(i))
 
         sheet = Sheet(
             individual_window,
@@ -609,11 +942,84 @@ class OntotlogyEditor:
         data: List[str] = [tab.sheet.get_cell_data(*i) for i in selected_cells]  # type: ignore
         self.find_individual(data)
 
+    def bulk_rename_window(self):
+        rename_window = tk.Toplevel(self.window)
+        rename_window.title("Bulk Rename")
+
+        ttk.Label(rename_window, text="Old and new name per line").grid(row=0, column=0, columnspan=2, padx=5, sticky="w")
+        mapping_text = tk.Text(rename_window, width=60, height=15)
+        mapping_text.grid(row=1, column=0, columnspan=2, padx=5, pady=5)
+        ttk.Label(rename_window, text="or find (regex, ^ for a prefix)").grid(row=2, column=0, padx=5, sticky="w")
+        find_entry = ttk.Entry(rename_window)
+        find_entry.grid(row=2, column=1, padx=5, pady=2, sticky="ew")
+        ttk.Label(rename_window, text="replace with").grid(row=3, column=0, padx=5, sticky="w")
+        replace_entry = ttk.Entry(rename_window)
+        replace_entry.grid(row=3, column=1, padx=5, pady=2, sticky="ew")
+
+        def submit():
+            lines = mapping_text.get("1.0", tk.END)
+            find, replace = find_entry.get(), replace_entry.get()
+
+            def done(result):
+                if isinstance(result, str):
+                    messagebox.showwarning("Warning", result)
+                    return
+                renamed, touched, missing = result
+                rename_window.destroy()
+                message = f"Renamed {renamed - len(missing)} names, {touched} triples changed."
+                if missing:
+                    message += f"\nNot found: {', '.join(missing[:10])}"
+                messagebox.showinfo("Bulk Rename", message)
+                self.refresh_tables(self.tabs)
+
+            self.worker.submit(self.traced("Bulk Rename", lambda: self.bulk_rename(lines, find, replace)), done)
+
+        apply_button = ttk.Button(rename_window, text="Rename", command=submit)
+        apply_button.grid(row=4, column=0, columnspan=2, padx=5, pady=5, sticky="ew")
+
+    def bulk_rename(self, lines: str, find: str, replace: str):
+        names = set(self.update_data_class()) | set(self.update_data_individual())
+        for property_type in ("owl:ObjectProperty", "owl:DatatypeProperty"):
+            names.update(i.property.name for i in database.get_properties(property_type))
+
+        mapping = {}
+        if lines.strip():
+            for line in lines.splitlines():
+                parts = re.split(r"\s*(?:->|,|\t|\s)\s*", line.strip())
+                if parts == [""]:
+                    continue
+                if len(parts) != 2:
+                    return f"Check line: {line}"
+                mapping[parts[0]] = parts[1]
+        elif find:
+            try:
+                pattern = re.compile(find)
+            except re.error as e:
+                return f"Invalid expression: {e}"
+            mapping = {i: pattern.sub(replace, i) for i in names}
+        mapping = {old: new for old, new in mapping.items() if old != new}
+        if not mapping:
+            return "Nothing to rename."
+
+        invalid = [i for pair in mapping.items() for i in pair if database.name_term(i) is None]
+        if invalid:
+            return f"Invalid name: {invalid[0]}"
+        new_names = list(mapping.values())
+        if len(set(new_names)) != len(new_names):
+            return "Check input args."
+        taken = [i for i in new_names if i in names and i not in mapping]
+        if taken:
+            return f"Already exists: {', '.join(taken[:10])}"
+        return (len(mapping), *database.rename_many(mapping))
+
     def delete_all(self):
-        database.delete_all()
-        self.refresh_tables(self.tabs)
+        def action():
+            database.delete_all()
+
+        self.run_mutation(action, name="Delete All")
 
     def connect_property_window(self):
+        self.load_name_index()
         self.connect_property_from_window = Tk()
         self.connect_property_from_window.title("Connect Property")
         self.connect_property_from_window.geometry("500x500")
@@ -624,22 +1030,33 @@ class OntotlogyEditor:
         entry = ttk.Entry(self.connect_property_from_window)
         entry.place(relx=0.5, rely=0.1, anchor=CENTER)
         entries.append(entry)
+        property_type = entry
+
+        def complete_property(prefix: str) -> List[str]:
+            if property_type.get() in ("ObjectProperty", "DatatypeProperty"):
+                return self.completer(property_type.get())(prefix)
+            return self.completer("ObjectProperty", "DatatypeProperty")(prefix)
+
+        def complete_value(prefix: str) -> List[str]:
+            if property_type.get() == "ObjectProperty":
+                return self.completer("NamedIndividual")(prefix)
+            return []
 
         label = ttk.Label(self.connect_property_from_window, text="Object Name")
         label.place(relx=0.5, rely=0.2, anchor=CENTER)
-        entry = ttk.Entry(self.connect_property_from_window)
+        entry = AutocompleteEntry(self.connect_property_from_window, self.completer("NamedIndividual"))
         entry.place(relx=0.5, rely=0.25, anchor=CENTER)
         entries.append(entry)
 
         label = ttk.Label(self.connect_property_from_window, text="Property")
         label.place(relx=0.5, rely=0.35, anchor=CENTER)
-        entry = ttk.Entry(self.connect_property_from_window)
+        entry = AutocompleteEntry(self.connect_property_from_window, complete_property)
         entry.place(relx=0.5, rely=0.4, anchor=CENTER)
         entries.append(entry)
 
         label = ttk.Label(self.connect_property_from_window, text="Value")
         label.place(relx=0.5, rely=0.5, anchor=CENTER)
-        entry = ttk.Entry(self.connect_property_from_window)
+        entry = AutocompleteEntry(self.connect_property_from_window, complete_value)
         entry.place(relx=0.5, rely=0.55, anchor=CENTER)
         entries.append(entry)
 
@@ -654,75 +1071,87 @@ class OntotlogyEditor:
         self.submit_button.place(relx=0.5, rely=0.85, anchor=CENTER)
 
     def connect_property(self, entries: List[ttk.Entry]):
-        type_property = entries[0].get()
-        subject = entries[1].get()
-        property = entries[2].get()
-        object_class = entries[3].get()
-        value_type = entries[4].get()
+        values = [i.get() for i in entries]
+
+        def action():
+            with database.session():
+                return self._connect_property(*values)
 
+        def done(warning: Optional[str]):
+            if warning:
+                messagebox.showwarning("Warning", warning)
+                return
+            self.connect_property_from_window.destroy()
+
+        self.worker.submit(self.traced("Connect Property", action), done)
+
+    def _connect_property(self, type_property: str, subject: str, property: str, object_class: str, value_type: str):
         allows_range = ["xsd:decimal", "xsd:int", "xsd:string"]
         if value_type not in allows_range and type_property == 'DatatypeProperty':
-            messagebox.showwarning("Warning", "Check input args.")
-            return
+            return "Check input args."
         validation = validate_input({
             'NamedIndividual': subject,
             type_property: property
         })
         try:
             if not validation['NamedIndividual'] or not validation[type_property]:
-                messagebox.showwarning("Warning", "Check input args.")
-                return
+                return "Check input args."
         except KeyError:
-            messagebox.showwarning("Warning", "Check input args.")
-            return
+            return "Check input args."
         if type_property == 'ObjectProperty':
             validation = validate_input({
                 'NamedIndividual': object_class
             })
             if not validation['NamedIndividual']:
-                messagebox.showwarning("Warning", "Check input args.")
-                return
+                return "Check input args."
             database.execute_post_query(
                 f"<{subject}>", f"<{property}>", f"<{object_class}>"
             )
         elif type_property == 'DatatypeProperty':
             database.execute_post_query(
-                f"<{subject}>", f"<{property}>", f'"{object_class}"^^{value_type}'
+                f"<{subject}>", f"<{property}>", f'"{database.escape_literal(object_class)}"^^{value_type}'
             )
 
-        self.refresh_tables(self.tabs)
-        self.connect_property_from_window.destroy()
-
     def delete(self, tab: Tab):
         selected_cells = tab.sheet.get_selected_cells()
         data: List[str] = [tab.sheet.get_cell_data(*i) for i in selected_cells]  # type: ignore
+        delete_item: Callable[[str], Any]
         if tab.tab == self.class_tab:
-            for i in data:
-                self.delete_class(i)
+            delete_item = self.delete_class
         elif tab.tab == self.individual_tab:
-            for i in data:
-                self.delete_instance(i)
+            delete_item = self.delete_instance
         elif tab.tab == self.object_property_tab:
-            for i in data:
-                self.delete_object_property(i)
+            delete_item = self.delete_object_property
         elif tab.tab == self.data_property_tab:
-            for i in data:
-                self.delete_data_property(i)
+            delete_item = self.delete_data_property
+        else:
+            return
+
+        def action():
+            with database.session():
+                warnings = [delete_item(i) for i in data]
+            return "\n".join(i for i in warnings if i)
+
+        self.run_mutation(
+            action, None if tab.tab == self.class_tab else [tab.tab], refresh_on_warning=True, name="Delete"
+        )
 
     def delete_individual_property_form(self, tab: ttk.Frame):
+        self.load_name_index()
         self.delete_form_window = Tk()
         self.delete_form_window.title("Delete Property Form")
         entries = []
         self.delete_form_window.geometry("500x300")
+        property_kind = "DatatypeProperty" if tab == self.data_property_tab else "ObjectProperty"
         label = ttk.Label(self.delete_form_window, text="Property Name")
         label.place(relx=0.5, rely=0.1, anchor=CENTER)
-        entry = ttk.Entry(self.delete_form_window)
+        entry = AutocompleteEntry(self.delete_form_window, self.completer(property_kind))
         entry.place(relx=0.5, rely=0.25, anchor=CENTER)
         entries.append(entry)
 
         label = ttk.Label(self.delete_form_window, text="Individual Name")
         label.place(relx=0.5, rely=0.4, anchor=CENTER)
-        entry = ttk.Entry(self.delete_form_window)
+        entry = AutocompleteEntry(self.delete_form_window, self.completer("NamedIndividual"))
         entry.place(relx=0.5, rely=0.55, anchor=CENTER)
         entries.append(entry)
 
@@ -730,105 +1159,89 @@ class OntotlogyEditor:
                                         command=lambda: self.delete_individual_property(tab, entries))
         self.submit_button.place(relx=0.5, rely=0.8, anchor=CENTER)
 
-    def delete_individual_property(self, tab: ttk.Frame, entries: List[ttk.Entry]):
+    def delete_individual_property(self, tab: ttk.Frame, entries: Sequence[ttk.Entry]):
+        property_name, individual_name = entries[0].get(), entries[1].get()
+        delete_property: Callable[[str, str], Any]
         if tab == self.data_property_tab:
-            self.instance_delete_data_property(entries[0].get(), entries[1].get())
+            delete_property = self.instance_delete_data_property
         else:
-            self.instance_delete_object_property(entries[0].get(), entries[1].get())
+            delete_property = self.instance_delete_object_property
+
+        def action():
+            with database.session():
+                return delete_property(property_name, individual_name)
+
+        self.run_mutation(action, [], name="Delete Property")
         self.delete_form_window.destroy()
 
-    def instance_delete_data_property(self, data_property: str, individual_name: str, hide=False):
+    def instance_delete_data_property(self, data_property: str, individual_name: str):
         all_info = get_full_info(individual_name, "owl:NamedIndividual")
         if not all_info:
-            messagebox.showwarning("Warning", "Such individual doesn't exist.")
-            return
+            return "Such individual doesn't exist."
         validation = validate_input({
             'DatatypeProperty': data_property,
         })
         if not validation['DatatypeProperty']:
-            messagebox.showwarning("Warning", "Check input args.")
-            return
-        for i in all_info:
-            if i["relation"].split("/")[-1][:-1] == data_property:
-                database.execute_delete_query(
-                    f'<{i["subject"].split("/")[-1][:-1]}>',
-                    f'<{i["relation"].split("/")[-1][:-1]}>',
-                    f'"{i["object"].split("^^")[0][1:-1]}"^^{data_property_template[i["object"].split("#")[-1][:-1]]}',
-                )
-        if not hide:
-            self.refresh_tables(self.tabs)
+            return "Check input args."
+        database.execute_delete_many(
+            (
+                f'<{i.subject.name}>',
+                f'<{i.relation.name}>',
+                f'"{i.object.value}"^^{data_property_template[i.object.datatype.name]}',
+            )
+            for i in all_info
+            if i.relation.name == data_property
+        )
 
-    def instance_delete_object_property(self, object_property: str, individual_name: str, hide=False):
+    def instance_delete_object_property(self, object_property: str, individual_name: str):
         all_info = get_full_info(individual_name, "owl:NamedIndividual")
         if not all_info:
-            messagebox.showwarning("Warning", "Such individual doesn't exist.")
-            return
+            return "Such individual doesn't exist."
         validation = validate_input({
             'ObjectProperty': object_property,
         })
         if not validation['ObjectProperty']:
-            messagebox.showwarning("Warning", "Check input args.")
-            return
-        for i in all_info:
-            if i["relation"].split("/")[-1][:-1] == object_property:
-                database.execute_delete_query(
-                    f'<{i["subject"].split("/")[-1][:-1]}>',
-                    f'<{i["relation"].split("/")[-1][:-1]}>',
-                    f'<{i["object"].split("/")[-1][:-1]}>',
-                )
-        if not hide:
-            self.refresh_tables(self.tabs)
+            return "Check input args."
+        database.execute_delete_many(
+            (
+                f'<{i.subject.name}>',
+                f'<{i.relation.name}>',
+                f'<{i.object.name}>',
+            )
+            for i in all_info
+            if i.relation.name == object_property
+        )
 
     def delete_class(self, subject_class: str):
-        all_info = get_full_info(subject_class, "owl:Class")
-        if not all_info:
-            messagebox.showwarning("Warning", "Such class doesn't exist.")
-            return
-        connected_object: Set[str] = set()
-        for i in database.execute_get_query():
-            if i["object"].split("/")[-1][:-1] == subject_class:
-                connected_object.add(i["subject"].split("/")[-1][:-1])
-        for i in connected_object:
-            self.delete_instance(i, hide=True)
-            self.delete_data_property(i, hide=True)
-            self.delete_object_property(i, hide=True)
-        database.delete_class_or_individual(subject_class)
-
-        self.refresh_tables(self.tabs)
-
-    def delete_instance(self, instance_name: str, hide=False):
+        if not check_class_existing(subject_class):
+            return "Such class doesn't exist."
+        return f"Removed {database.delete_class_cascade(subject_class)} triples with class {subject_class}."
+
+    def delete_instance(self, instance_name: str):
         all_info = get_full_info(instance_name, "owl:NamedIndividual")
         if not all_info:
-            if not hide:
-                messagebox.showwarning("Warning", "Such instance doesn't exist.")
-            return
+            return "Such instance doesn't exist."
         database.delete_class_or_individual(instance_name)
-        if not hide:
-            self.refresh_tables(self.tabs)
 
-    def delete_object_property(self, object_property: str, hide=False):
+    def delete_object_property(self, object_property: str):
         all_info = get_full_info(object_property, "owl:ObjectProperty")
         if not all_info:
-            if not hide:
-                messagebox.showwarning("Warning", "Such property doesn't exist.")
-            return
+            return "Such property doesn't exist."
         database.delete_property(object_property)
-        if not hide:
-            self.refresh_tables(self.tabs)
 
-    def delete_data_property(self, data_property: str, hide=False):
+    def delete_data_property(self, data_property: str):
         all_info = get_full_info(data_property, "owl:DatatypeProperty")
         if not all_info:
-            if not hide:
-                messagebox.showwarning("Warning", "Such property doesn't exist.")
-            return
+            return "Such property doesn't exist."
         database.delete_property(data_property)
-        if not hide:
-            self.refresh_tables(self.tabs)
 
     def run(self):
-        self.window.mainloop()
+        try:
+            self.window.mainloop()
+        finally:
+            database.backend.close()
 
 
-editor = OntotlogyEditor()
-editor.run()
+if __name__ == "__main__":
+    editor = OntotlogyEditor()
+    editor.run()
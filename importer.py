@@ -0,0 +1,206 @@
+import csv
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import database
+import settings
+
+
+NAME = "Name"
+CLASS = "Class"
+SKIP = "(skip)"
+
+XSD = database.PREFIXES["xsd"]
+NUMBER_TYPES: Dict[str, Callable[[str], object]] = {
+    XSD + "decimal": Decimal,
+    XSD + "int": int,
+    XSD + "integer": int,
+}
+
+
+class RowError(NamedTuple):
+    line: int
+    message: str
+
+
+class ImportReport(NamedTuple):
+    imported: int
+    errors: List[RowError]
+
+
+def read_table(filename: str) -> Tuple[List[str], List[List[str]]]:
+    """Header and rows of a CSV file, or a TSV file when it ends with .tsv or .tab."""
+    delimiter = "\t" if filename.lower().endswith((".tsv", ".tab")) else ","
+    with open(filename, encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.reader(f, delimiter=delimiter))
+    if not rows:
+        return [], []
+    return rows[0], rows[1:]
+
+
+def guess_mapping(header: List[str], properties: Iterable[str]) -> List[str]:
+    """Map columns named like a property to it, and "name"/"class" columns to the individual."""
+    properties = set(properties)
+    mapping = []
+    for column in header:
+        column = column.strip()
+        if column.lower() in ("name", "individual", "имя"):
+            mapping.append(NAME)
+        elif column.lower() in ("class", "type", "класс"):
+            mapping.append(CLASS)
+        elif column in properties:
+            mapping.append(column)
+        else:
+            mapping.append(SKIP)
+    return mapping
+
+
+def get_properties() -> Dict[str, Tuple[str, Optional[str]]]:
+    """Property name -> (owl type, range IRI) for every object and datatype property."""
+    properties = {}
+    for type in ("owl:ObjectProperty", "owl:DatatypeProperty"):
+        for i in database.get_properties(type):
+            properties[i.property.name] = (type, None if i.range is None else i.range.iri)
+    return properties
+
+
+def _literal(value: str, datatype: Optional[str]) -> str:
+    if datatype in NUMBER_TYPES:
+        NUMBER_TYPES[datatype](value)
+    return '"%s"^^<%s>' % (database.escape_literal(value), datatype or XSD + "string")
+
+
+def _existing(names: Iterable[str], type: str) -> Set[str]:
+    names = list(names)
+    found: Set[str] = set()
+    for start in range(0, len(names), settings.IMPORT_BATCH_SIZE):
+        batch = names[start:start + settings.IMPORT_BATCH_SIZE]
+        found.update(name for name, _ in database.find_typed((i, type) for i in batch))
+    return found
+
+
+def import_rows(
+    rows: List[List[str]],
+    mapping: List[str],
+    default_class: Optional[str] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> ImportReport:
+    """Create an individual per row with the property values of its mapped columns.
+
+    Classes, properties and existing individuals are looked up once before
+    anything is written. Valid rows are then inserted IMPORT_BATCH_SIZE at a
+    time, one transaction per batch. Object property values naming another row
+    of the file are linked afterwards, only between rows that were imported.
+    Line numbers in the report count the header as line 1.
+    """
+    if NAME not in mapping:
+        return ImportReport(0, [RowError(1, "No column is mapped to the individual name.")])
+    name_column = mapping.index(NAME)
+    class_column = mapping.index(CLASS) if CLASS in mapping else None
+    properties = get_properties()
+    errors = [RowError(1, f"Unknown property {i}.") for i in mapping if i not in (NAME, CLASS, SKIP, *properties)]
+    if errors:
+        return ImportReport(0, errors)
+
+    def cell(row: List[str], column: Optional[int]) -> str:
+        return row[column].strip() if column is not None and column < len(row) else ""
+
+    names = [cell(i, name_column) for i in rows]
+    file_names = set(names)
+    classes = {i for i in (cell(row, class_column) or default_class for row in rows) if i}
+    known_classes = {name for name, _ in database.find_typed((i, "owl:Class") for i in classes)}
+    existing = _existing({i for i in names if database.name_term(i)}, "owl:NamedIndividual")
+    references = {
+        cell(row, column)
+        for row in rows
+        for column, property in enumerate(mapping)
+        if properties.get(property, ("",))[0] == "owl:ObjectProperty"
+    } - {""}
+    known_references = _existing({i for i in references if database.name_term(i)}, "owl:NamedIndividual")
+
+    rows_triples: Dict[str, List[Tuple[str, str, str]]] = {}
+    lines: Dict[str, int] = {}
+    links: List[Tuple[int, str, str, str]] = []
+    for line, (row, name) in enumerate(zip(rows, names), start=2):
+        class_name = cell(row, class_column) or default_class
+        if database.name_term(name) is None:
+            errors.append(RowError(line, f"Invalid individual name {name!r}."))
+            continue
+        if name in existing or name in lines:
+            errors.append(RowError(line, f"Individual {name} already exists."))
+            continue
+        if class_name not in known_classes:
+            errors.append(RowError(line, f"Unknown class {class_name}."))
+            continue
+
+        triples = [
+            (f"<{name}>", "rdf:type", "owl:NamedIndividual"),
+            (f"<{name}>", "rdf:type", f"<{class_name}>"),
+        ]
+        row_links = []
+        try:
+            for column, property in enumerate(mapping):
+                value = cell(row, column)
+                if property not in properties or not value:
+                    continue
+                type, property_range = properties[property]
+                if type == "owl:ObjectProperty":
+                    if value in known_references:
+                        triples.append((f"<{name}>", f"<{property}>", f"<{value}>"))
+                    elif value in file_names:
+                        row_links.append((line, name, property, value))
+                    else:
+                        raise ValueError(f"Unknown individual {value} in column {property}.")
+                else:
+                    try:
+                        triples.append((f"<{name}>", f"<{property}>", _literal(value, property_range)))
+                    except (ValueError, InvalidOperation):
+                        raise ValueError(f"Invalid value {value!r} in column {property}.")
+        except ValueError as e:
+            errors.append(RowError(line, str(e)))
+            continue
+
+        rows_triples[name] = triples
+        lines[name] = line
+        links.extend(row_links)
+
+    # A link to another row of the file holds only if that row passed too;
+    # dropping a row can break the links to it, so repeat until nothing changes.
+    changed = True
+    while changed:
+        changed = False
+        for line, name, property, value in links:
+            if name in lines and value not in lines:
+                errors.append(RowError(line, f"Unknown individual {value} in column {property}."))
+                del lines[name]
+                changed = True
+
+    imported_names = set()
+    done = 0
+    total = len(lines)
+    valid = list(lines)
+    for start in range(0, len(valid), settings.IMPORT_BATCH_SIZE):
+        batch = valid[start:start + settings.IMPORT_BATCH_SIZE]
+        if database.execute_post_many(i for name in batch for i in rows_triples[name]):
+            imported_names.update(batch)
+        else:
+            errors.extend(RowError(lines[i], "Changes were rolled back.") for i in batch)
+        done += len(batch)
+        if progress is not None:
+            progress(done, total)
+
+    # Links between rows of the file are written once both ends exist, so a
+    # rolled back batch never leaves a link to an individual that isn't there.
+    links = [i for i in links if i[1] in imported_names]
+    for line, name, property, value in links:
+        if value not in imported_names:
+            errors.append(RowError(line, f"Individual {value} in column {property} was not imported."))
+    links = [i for i in links if i[3] in imported_names]
+    for start in range(0, len(links), settings.IMPORT_BATCH_SIZE):
+        batch_links = links[start:start + settings.IMPORT_BATCH_SIZE]
+        triples = [(f"<{name}>", f"<{property}>", f"<{value}>") for _, name, property, value in batch_links]
+        if not database.execute_post_many(triples):
+            errors.extend(RowError(line, "Changes were rolled back.") for line in sorted({i[0] for i in batch_links}))
+
+    imported = len(imported_names)
+    return ImportReport(imported, sorted(errors))
@@ -0,0 +1,268 @@
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from franz.openrdf.exceptions import RequestError
+from rdflib import Graph, Literal, URIRef
+from rdflib.plugins.sparql import prepareQuery, prepareUpdate
+from rdflib.plugins.sparql.parser import parseUpdate
+
+import settings
+
+
+UPDATE_THROUGH_GET = "SPARQL/Update queries can only be performed through POST requests."
+
+
+class MemoryValue:
+    """Query result value that prints like the AllegroGraph client's values."""
+
+    __slots__ = ("node",)
+
+    def __init__(self, node) -> None:
+        self.node = node
+
+    def __str__(self) -> str:
+        return self.node.n3()
+
+
+class MemoryBindingSet:
+    __slots__ = ("row", "names")
+
+    def __init__(self, row: Dict[str, Any], names: List[str]) -> None:
+        self.row = row
+        self.names = names
+
+    def getValue(self, name: str) -> Optional[MemoryValue]:
+        if name not in self.names:
+            raise KeyError("Illegal key '%s' passed to binding set." % name)
+        node = self.row.get(name)
+        return None if node is None else MemoryValue(node)
+
+    def getBindingNames(self) -> List[str]:
+        return self.names
+
+
+class MemoryQueryResult:
+    """Rows of a SELECT.
+
+    With ``lock`` the rows are evaluated while they are read and the lock is
+    held until the result is closed, so a reader that stops early releases
+    the repository without waiting for the rest of the query.
+    """
+
+    def __init__(self, rows: Iterable[MemoryBindingSet], lock=None) -> None:
+        self.rows = rows
+        self.lock = lock
+
+    @classmethod
+    def of(cls, result, lock=None) -> "MemoryQueryResult":
+        names = [str(i) for i in result.vars or []]
+        rows = (
+            MemoryBindingSet({str(key): value for key, value in row.asdict().items()}, names)
+            for row in result
+        )
+        return cls(rows if lock is not None else list(rows), lock)
+
+    def __iter__(self) -> Iterator[MemoryBindingSet]:
+        return iter(self.rows)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.lock is not None:
+            self.lock.release()
+            self.lock = None
+
+
+def write_graph(graph: Graph, output=None, output_format=None) -> Optional[Graph]:
+    """Return a CONSTRUCT result, or write it to the ``output`` path as the client does."""
+    if output is None:
+        return graph
+    graph.serialize(destination=output, format=output_format.mime_types[0], encoding="utf-8")
+    return None
+
+
+class MemoryPreparedQuery:
+    """Query parsed once by rdflib and evaluated with the bindings set on it."""
+
+    def __init__(self, connection: "MemoryConnection", kind: str, query: str) -> None:
+        self.connection = connection
+        self.kind = kind
+        self.query = query
+        self.bindings: Dict[str, Any] = {}
+        base = connection.repository.base_iri
+        try:
+            self.parsed = prepareQuery(query, base=base)
+        except Exception as e:
+            raise RequestError(400, str(e))
+
+    def setBinding(self, name: str, value) -> None:
+        self.bindings[name] = value
+
+    def removeBinding(self, name: str) -> None:
+        self.bindings.pop(name, None)
+
+    def evaluate(self, output=None, output_format=None):
+        repository = self.connection.repository
+        with repository.lock:
+            result = repository.graph.query(self.parsed, initBindings=self.bindings)
+            if self.kind == "boolean":
+                return bool(result.askAnswer)
+            if self.kind == "tuple":
+                return MemoryQueryResult.of(result)
+            graph = result.graph
+        return write_graph(graph, output, output_format)
+
+
+class MemoryConnection:
+    """Subset of the RepositoryConnection API that database.py uses, backed by an rdflib graph."""
+
+    def __init__(self, repository: "MemoryRepository") -> None:
+        self.repository = repository
+
+    @property
+    def graph(self) -> Graph:
+        return self.repository.graph
+
+    def _with_base(self, query: str) -> str:
+        return "BASE <%s>\n%s" % (self.repository.base_iri, query)
+
+    def _query(self, query: str):
+        query = self._with_base(query)
+        try:
+            return self.graph.query(query)
+        except Exception as e:
+            try:
+                parseUpdate(query)
+            except Exception:
+                raise RequestError(400, str(e))
+            raise RequestError(400, UPDATE_THROUGH_GET)
+
+    def executeTupleQuery(self, query: str) -> MemoryQueryResult:
+        self.repository.lock.acquire()
+        try:
+            return MemoryQueryResult.of(self._query(query), self.repository.lock)
+        except BaseException:
+            self.repository.lock.release()
+            raise
+
+    def executeBooleanQuery(self, query: str) -> bool:
+        with self.repository.lock:
+            return bool(self._query(query).askAnswer)
+
+    def executeGraphQuery(self, query: str, output=None, output_format=None):
+        with self.repository.lock:
+            graph = self._query(query).graph
+        return write_graph(graph, output, output_format)
+
+    def executeUpdate(self, query: str) -> bool:
+        with self.repository.lock:
+            try:
+                parsed = prepareUpdate(query, base=self.repository.base_iri)
+            except Exception as e:
+                raise RequestError(400, str(e))
+            # Journaled before the graph changes, so a failed write can't leave memory ahead of disk.
+            self.repository.journal(query)
+            try:
+                self.graph.update(parsed)
+            except Exception as e:
+                # The update may have been applied in part; save the graph as it is now.
+                self.repository.loaded()
+                raise RequestError(400, str(e))
+            self.repository.updated()
+        return True
+
+    def prepareTupleQuery(self, query: str) -> MemoryPreparedQuery:
+        return MemoryPreparedQuery(self, "tuple", query)
+
+    def prepareBooleanQuery(self, query: str) -> MemoryPreparedQuery:
+        return MemoryPreparedQuery(self, "boolean", query)
+
+    def prepareGraphQuery(self, query: str) -> MemoryPreparedQuery:
+        return MemoryPreparedQuery(self, "graph", query)
+
+    def createURI(self, uri: str) -> URIRef:
+        return URIRef(uri)
+
+    def createLiteral(self, value: str, datatype=None) -> Literal:
+        return Literal(value, datatype=datatype)
+
+    def addFile(self, filePath: str, *args, **kwargs) -> None:
+        with self.repository.lock:
+            self.graph.parse(filePath)
+            self.repository.loaded()
+
+    def size(self) -> int:
+        return len(self.graph)
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryRepository:
+    """In-process stand-in for an AllegroGraph repository."""
+
+    def __init__(self, graph: Optional[Graph] = None, base_iri: Optional[str] = None) -> None:
+        self.graph = Graph() if graph is None else graph
+        self.base_iri = base_iri or settings.BASE_IRI
+        self.lock = threading.RLock()
+
+    def getConnection(self) -> MemoryConnection:
+        return MemoryConnection(self)
+
+    def journal(self, query: str) -> None:
+        pass
+
+    def updated(self) -> None:
+        pass
+
+    def loaded(self) -> None:
+        pass
+
+
+class PersistentRepository(MemoryRepository):
+    """MemoryRepository kept in an N-Triples snapshot plus a journal of updates.
+
+    Updates are appended to the journal before they are applied and replayed on open;
+    ``compact`` folds them into a new snapshot.
+    """
+
+    def __init__(self, path: str, base_iri: Optional[str] = None, compact_every: int = 1000) -> None:
+        super().__init__(base_iri=base_iri)
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.compact_every = compact_every
+        self.pending = 0
+        if os.path.isfile(self.path):
+            self.graph.parse(self.path, format="nt")
+        if os.path.isfile(self.journal_path):
+            with open(self.journal_path, encoding="utf-8") as journal:
+                for line in journal:
+                    self.graph.update("BASE <%s>\n%s" % (self.base_iri, json.loads(line)))
+                    self.pending += 1
+
+    def journal(self, query: str) -> None:
+        with open(self.journal_path, "a", encoding="utf-8") as journal:
+            journal.write(json.dumps(query) + "\n")
+
+    def updated(self) -> None:
+        self.pending += 1
+        if self.pending >= self.compact_every:
+            self.compact()
+
+    def loaded(self) -> None:
+        self.compact()
+
+    def compact(self) -> None:
+        with self.lock:
+            temporary_path = self.path + ".tmp"
+            self.graph.serialize(temporary_path, format="nt", encoding="utf-8")
+            os.replace(temporary_path, self.path)
+            if os.path.isfile(self.journal_path):
+                os.remove(self.journal_path)
+            self.pending = 0
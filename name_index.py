@@ -0,0 +1,72 @@
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+KINDS = ("Class", "NamedIndividual", "ObjectProperty", "DatatypeProperty")
+
+
+class NameIndex:
+    """Sorted local names of classes, individuals and properties for prefix lookups.
+
+    Each kind keeps a list of ``(casefolded name, name)`` pairs in order, so
+    the completions of a prefix are found with a binary search.
+    """
+
+    def __init__(self) -> None:
+        self.names: Dict[str, List[Tuple[str, str]]] = {i: [] for i in KINDS}
+        self.loaded = False
+        self._lock = threading.Lock()
+
+    def load(self, entries: Iterable[Tuple[str, str]]) -> None:
+        names: Dict[str, List[Tuple[str, str]]] = {i: [] for i in KINDS}
+        for name, kind in entries:
+            names[kind].append((name.casefold(), name))
+        with self._lock:
+            self.names = {kind: sorted(set(i)) for kind, i in names.items()}
+            self.loaded = True
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.names = {i: [] for i in KINDS}
+            self.loaded = False
+
+    def add(self, name: str, kind: str) -> None:
+        entry = (name.casefold(), name)
+        with self._lock:
+            names = self.names[kind]
+            index = bisect_left(names, entry)
+            if index == len(names) or names[index] != entry:
+                insort(names, entry)
+
+    def remove(self, name: str, kind: Optional[str] = None) -> List[str]:
+        """Remove ``name`` from ``kind`` or from every kind; return the kinds it was in."""
+        entry = (name.casefold(), name)
+        removed = []
+        with self._lock:
+            for i in [kind] if kind else KINDS:
+                names = self.names[i]
+                index = bisect_left(names, entry)
+                if index < len(names) and names[index] == entry:
+                    del names[index]
+                    removed.append(i)
+        return removed
+
+    def rename(self, mapping: Dict[str, str]) -> None:
+        kinds = {old: self.remove(old) for old in mapping}
+        for old, new in mapping.items():
+            for kind in kinds[old]:
+                self.add(new, kind)
+
+    def complete(self, prefix: str, kinds: Iterable[str] = KINDS, limit: int = 10) -> List[str]:
+        """Up to ``limit`` names of the given kinds starting with ``prefix``, ignoring case."""
+        key = prefix.casefold()
+        found = set()
+        with self._lock:
+            for kind in kinds:
+                names = self.names[kind]
+                start = index = bisect_left(names, (key, ""))
+                while index < len(names) and index - start < limit and names[index][0].startswith(key):
+                    found.add(names[index])
+                    index += 1
+        return [name for _, name in sorted(found)[:limit]]
@@ -0,0 +1,51 @@
+import threading
+import weakref
+from typing import Any, Dict, Set, Tuple
+
+
+class PreparedQueries:
+    """Query templates prepared once per connection and reused with new bindings.
+
+    Constants are passed as bindings instead of being pasted into the query
+    text, so a name with ``>`` or quotes in it stays a value. Each template
+    is prepared the first time a connection runs it; the embedded store
+    parses it only then.
+    """
+
+    PREPARE = {
+        "tuple": "prepareTupleQuery",
+        "boolean": "prepareBooleanQuery",
+        "graph": "prepareGraphQuery",
+    }
+
+    def __init__(self) -> None:
+        self._prepared: "weakref.WeakKeyDictionary[Any, Dict[str, Tuple[Any, Set[str]]]]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.prepared = 0
+
+    def get(self, connection, kind: str, query: str, bindings: Dict[str, str]):
+        """The prepared ``query`` of ``connection`` with ``bindings`` (N-Triples terms) set."""
+        with self._lock:
+            queries = self._prepared.setdefault(connection, {})
+        entry = queries.get(query)
+        if entry is None:
+            entry = queries[query] = (getattr(connection, self.PREPARE[kind])(query=query), set())
+            self.prepared += 1
+        prepared, bound = entry
+        for name in bound - bindings.keys():
+            prepared.removeBinding(name)
+        for name, value in bindings.items():
+            prepared.setBinding(name, to_value(connection, value))
+        bound.clear()
+        bound.update(bindings)
+        return prepared
+
+
+def to_value(connection, text: str):
+    """Client value for an N-Triples term as written in database.py, without escaping."""
+    if text.startswith('"'):
+        end = text.rfind('"^^')
+        if end > 0:
+            return connection.createLiteral(text[1:end], datatype=connection.createURI(text[end + 3:][1:-1]))
+        return connection.createLiteral(text[1:-1])
+    return connection.createURI(text[1:-1])
@@ -0,0 +1,71 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+
+def normalize(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip()
+
+
+class QueryCache:
+    """LRU cache of read query results keyed on normalized query text.
+
+    Every write bumps ``generation``, which drops all cached results. A result
+    is only stored if no write happened while it was being loaded.
+    """
+
+    def __init__(self, max_size: int = 256) -> None:
+        self.max_size = max_size
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def bump(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: str, value: Any, generation: int) -> None:
+        with self._lock:
+            if self.max_size <= 0 or generation != self.generation:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def fetch(self, query: str, load: Callable[[], Any]) -> Any:
+        key = normalize(query)
+        hit, value = self.get(key)
+        if hit:
+            return value
+        generation = self.generation
+        value = load()
+        self.put(key, value, generation)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "generation": self.generation,
+        }
@@ -1,3 +1,6 @@
+from typing import Optional
+
+
 REPOSITORY_NAME = "PBZ"
 
 CATALOG_NAME = ''
@@ -13,3 +16,41 @@ USER = 'test'
 PASSWORD = 'xyzzy'
 
 OWL_FILES_STORAGE = './ontologies/'
+
+BASE_IRI = f'http://127.0.0.1:{PORT}/repositories/{REPOSITORY_NAME}/'
+
+TRIPLE_CACHE = False
+
+POOL_SIZE = 4
+
+POOL_HEALTH_CHECK_INTERVAL = 30
+
+# Seconds to wait for a free pooled connection before giving up with an error
+POOL_TIMEOUT = 30
+
+QUERY_PAGE_SIZE = 500
+
+QUERY_MAX_ROWS = 100000
+
+# Seconds a query from the Query tab may run, or None
+QUERY_TIMEOUT = 60
+
+QUERY_CACHE_SIZE = 256
+
+# Rows written per transaction by the table import
+IMPORT_BATCH_SIZE = 1000
+
+# Names offered while typing in the entry forms
+AUTOCOMPLETE_LIMIT = 10
+
+# "allegrograph" or "embedded" (in-process store saved to EMBEDDED_STORE_PATH)
+BACKEND = "allegrograph"
+
+EMBEDDED_STORE_PATH: Optional[str] = './store.nt'
+
+EMBEDDED_COMPACT_EVERY = 1000
+
+TRACE_BUFFER_SIZE = 5000
+
+# Path of a JSONL file every query is appended to, or None
+TRACE_FILE = None
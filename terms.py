@@ -0,0 +1,81 @@
+from typing import Dict, NamedTuple, Optional
+
+
+MAX_TERMS = 100000
+
+
+class Term:
+    """RDF term parsed once from the N-Triples form the server returns."""
+
+    __slots__ = ("text", "namespace", "name", "value", "datatype")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.namespace: Optional[str] = None
+        self.name = ""
+        self.value: Optional[str] = None
+        self.datatype: Optional[Term] = None
+        if text.startswith("<"):
+            iri = text[1:-1]
+            cut = max(iri.rfind("/"), iri.rfind("#")) + 1
+            self.namespace, self.name = iri[:cut], iri[cut:]
+        elif text.startswith('"'):
+            end = text.rfind('"')
+            self.value = text[1:end]
+            if text.startswith("^^", end + 1):
+                self.datatype = term(text[end + 3:])
+        else:
+            self.name = text
+
+    @property
+    def iri(self) -> Optional[str]:
+        return None if self.namespace is None else self.namespace + self.name
+
+    @property
+    def is_literal(self) -> bool:
+        return self.value is not None
+
+    @property
+    def label(self) -> str:
+        return self.value if self.value is not None else self.name
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Term) and other.text == self.text
+
+    def __hash__(self) -> int:
+        return hash(self.text)
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f"Term({self.text!r})"
+
+
+_terms: Dict[str, Term] = {}
+
+
+def term(text: str) -> Term:
+    """Parse a term, reusing the instance already made for the same text."""
+    parsed = _terms.get(text)
+    if parsed is None:
+        if len(_terms) >= MAX_TERMS:
+            _terms.clear()
+        parsed = _terms[text] = Term(text)
+    return parsed
+
+
+class SubjectRow(NamedTuple):
+    subject: Term
+
+
+class TripleRow(NamedTuple):
+    subject: Term
+    relation: Term
+    object: Term
+
+
+class PropertyRow(NamedTuple):
+    property: Term
+    domain: Optional[Term] = None
+    range: Optional[Term] = None
@@ -0,0 +1,159 @@
+import json
+import math
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from types import FrameType
+from typing import Any, Deque, Dict, Iterator, List, NamedTuple, Optional
+
+
+class QueryRecord(NamedTuple):
+    timestamp: float
+    kind: str
+    function: str
+    action: Optional[str]
+    query: str
+    server_time: float
+    decode_time: float
+    rows: int
+    bytes: int
+
+    @property
+    def total_time(self) -> float:
+        return self.server_time + self.decode_time
+
+
+class ActionRecord(NamedTuple):
+    timestamp: float
+    action: str
+    duration: float
+    queries: int
+    rows: int
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+class Tracer:
+    """Keeps the most recent repository calls and optionally appends them to a JSONL file."""
+
+    def __init__(self, size: int = 5000, path: Optional[str] = None, module: str = "database") -> None:
+        self.records: Deque[QueryRecord] = deque(maxlen=size)
+        self.actions: Deque[ActionRecord] = deque(maxlen=size)
+        self.path = path
+        self.enabled = size > 0 or bool(path)
+        self.module = module
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def action(self, name: str) -> Iterator[None]:
+        """Attribute every call made by this thread inside the block to a user action."""
+        previous = getattr(self._local, "action", None), getattr(self._local, "counts", None)
+        self._local.action = name
+        self._local.counts = counts = [0, 0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._local.action, self._local.counts = previous
+            if self.enabled:
+                self._write(ActionRecord(time.time(), name, time.perf_counter() - start, *counts), self.actions)
+
+    def caller(self) -> str:
+        frame: Optional[FrameType] = sys._getframe(1)
+        while frame is not None:
+            code = frame.f_code
+            if frame.f_globals.get("__name__") == self.module and not code.co_name.startswith(("_", "<")):
+                return code.co_name
+            frame = frame.f_back
+        return "?"
+
+    def record(
+        self,
+        kind: str,
+        query: str,
+        server_time: float,
+        decode_time: float = 0.0,
+        rows: int = 0,
+        bytes: int = 0,
+    ) -> None:
+        if not self.enabled:
+            return
+        record = QueryRecord(
+            time.time(),
+            kind,
+            self.caller(),
+            getattr(self._local, "action", None),
+            query,
+            server_time,
+            decode_time,
+            rows,
+            bytes,
+        )
+        counts = getattr(self._local, "counts", None)
+        if counts is not None:
+            counts[0] += 1
+            counts[1] += rows
+        self._write(record, self.records)
+
+    def _write(self, record: NamedTuple, buffer: deque) -> None:
+        with self._lock:
+            buffer.append(record)
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as trace:
+                    entry = {"type": type(record).__name__, **record._asdict()}
+                    trace.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def clear(self) -> None:
+        with self._lock:
+            self.records.clear()
+            self.actions.clear()
+
+    def function_stats(self) -> List[Dict[str, Any]]:
+        """Count, p50/p95 latency, rows and bytes of the buffered queries per database function."""
+        with self._lock:
+            records = list(self.records)
+        groups: Dict[str, List[QueryRecord]] = {}
+        for i in records:
+            groups.setdefault(i.function, []).append(i)
+
+        result = []
+        for name, group in groups.items():
+            times = sorted(i.total_time for i in group)
+            result.append({
+                "name": name,
+                "count": len(group),
+                "p50": percentile(times, 0.5),
+                "p95": percentile(times, 0.95),
+                "rows": sum(i.rows for i in group),
+                "bytes": sum(i.bytes for i in group),
+            })
+        return sorted(result, key=lambda i: i["p95"], reverse=True)
+
+    def action_stats(self) -> List[Dict[str, Any]]:
+        """Count, p50/p95 duration, queries and rows of the buffered user actions."""
+        with self._lock:
+            actions = list(self.actions)
+        groups: Dict[str, List[ActionRecord]] = {}
+        for i in actions:
+            groups.setdefault(i.action, []).append(i)
+
+        result = []
+        for name, group in groups.items():
+            times = sorted(i.duration for i in group)
+            result.append({
+                "name": name,
+                "count": len(group),
+                "p50": percentile(times, 0.5),
+                "p95": percentile(times, 0.95),
+                "queries": sum(i.queries for i in group),
+                "rows": sum(i.rows for i in group),
+            })
+        return sorted(result, key=lambda i: i["p95"], reverse=True)
@@ -0,0 +1,127 @@
+import threading
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+
+Index = Dict[str, Dict[str, Set[str]]]
+Triple = Tuple[str, str, str]
+
+
+class TripleCache:
+    """In-process copy of the repository with SPO, POS and OSP indexes.
+
+    Terms are kept in the same N-Triples form the server returns, so cached
+    rows are indistinguishable from the ones read over the network.
+
+    Every method holds ``lock``, so the indexes can be shared between threads;
+    hold it yourself to make several calls appear as one change.
+    """
+
+    def __init__(self) -> None:
+        self.spo: Index = {}
+        self.pos: Index = {}
+        self.osp: Index = {}
+        self.loaded = False
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return sum(len(objects) for predicates in self.spo.values() for objects in predicates.values())
+
+    def clear(self) -> None:
+        with self.lock:
+            self.spo.clear()
+            self.pos.clear()
+            self.osp.clear()
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self.clear()
+            self.loaded = False
+
+    @staticmethod
+    def _index_add(index: Index, a: str, b: str, c: str) -> None:
+        index.setdefault(a, {}).setdefault(b, set()).add(c)
+
+    @staticmethod
+    def _index_remove(index: Index, a: str, b: str, c: str) -> None:
+        second = index.get(a)
+        if second is None or b not in second:
+            return
+        second[b].discard(c)
+        if not second[b]:
+            del second[b]
+            if not second:
+                del index[a]
+
+    def add(self, s: str, p: str, o: str) -> None:
+        with self.lock:
+            self._index_add(self.spo, s, p, o)
+            self._index_add(self.pos, p, o, s)
+            self._index_add(self.osp, o, s, p)
+
+    def remove(self, s: str, p: str, o: str) -> None:
+        with self.lock:
+            self._index_remove(self.spo, s, p, o)
+            self._index_remove(self.pos, p, o, s)
+            self._index_remove(self.osp, o, s, p)
+
+    def contains(self, s: str, p: str, o: str) -> bool:
+        with self.lock:
+            return o in self.spo.get(s, {}).get(p, ())
+
+    def match(self, s: Optional[str] = None, p: Optional[str] = None, o: Optional[str] = None) -> Iterator[Triple]:
+        """Triples matching the pattern, collected under the lock so later writes don't affect them."""
+        with self.lock:
+            return iter(list(self._match(s, p, o)))
+
+    def _match(self, s: Optional[str], p: Optional[str], o: Optional[str]) -> Iterator[Triple]:
+        if s is not None:
+            predicates = self.spo.get(s, {})
+            for predicate in [p] if p is not None else list(predicates):
+                for obj in list(predicates.get(predicate, ())):
+                    if o is None or obj == o:
+                        yield s, predicate, obj
+        elif p is not None:
+            by_object = self.pos.get(p, {})
+            for obj in [o] if o is not None else list(by_object):
+                for subject in list(by_object.get(obj, ())):
+                    yield subject, p, obj
+        elif o is not None:
+            for subject, relations in list(self.osp.get(o, {}).items()):
+                for predicate in list(relations):
+                    yield subject, predicate, o
+        else:
+            for subject, predicates in list(self.spo.items()):
+                for predicate, objects in list(predicates.items()):
+                    for obj in list(objects):
+                        yield subject, predicate, obj
+
+    def remove_node(self, term: str, subject: bool = True, relation: bool = False, object: bool = False) -> None:
+        with self.lock:
+            matched: List[Triple] = []
+            if subject:
+                matched.extend(self.match(s=term))
+            if relation:
+                matched.extend(self.match(p=term))
+            if object:
+                matched.extend(self.match(o=term))
+            for triple in matched:
+                self.remove(*triple)
+
+    def rename(self, old: str, new: str, position: int) -> None:
+        self.rename_many({old: new}, position)
+
+    def rename_many(self, mapping: Dict[str, str], position: int) -> None:
+        """Rename terms at ``position`` all at once, so chains and swaps in ``mapping`` work."""
+        with self.lock:
+            matched: List[Triple] = []
+            for old in mapping:
+                pattern: List[Optional[str]] = [None, None, None]
+                pattern[position] = old
+                matched.extend(self.match(*pattern))
+            for triple in matched:
+                self.remove(*triple)
+            for triple in matched:
+                renamed = list(triple)
+                renamed[position] = mapping[triple[position]]
+                self.add(*renamed)
@@ -0,0 +1,164 @@
+import itertools
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class BackgroundWorker:
+    """Runs repository calls on a worker thread.
+
+    Results are handed back to the Tk thread by polling with ``window.after``,
+    so callbacks may touch widgets. Jobs submitted with the same ``key``
+    replace each other: only the newest one is run and reported.
+    """
+
+    def __init__(
+        self,
+        window,
+        on_busy: Optional[Callable[[bool], None]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+        poll_interval: int = 50,
+    ) -> None:
+        self.window = window
+        self.on_busy = on_busy
+        self.on_error = on_error
+        self.poll_interval = poll_interval
+        self.busy = False
+        self._jobs: "queue.Queue[tuple]" = queue.Queue()
+        self._results: "queue.Queue[tuple]" = queue.Queue()
+        self._latest: Dict[str, int] = {}
+        self._ids = itertools.count()
+        self._pending = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self.window.after(self.poll_interval, self._poll)
+
+    def submit(
+        self,
+        func: Callable[[], Any],
+        on_done: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+        key: Optional[str] = None,
+    ) -> int:
+        job_id = next(self._ids)
+        if key is not None:
+            self._latest[key] = job_id
+        self._pending += 1
+        self._set_busy(True)
+        self._jobs.put((key, job_id, func, on_done, on_error))
+        return job_id
+
+    def is_current(self, key: Optional[str], job_id: int) -> bool:
+        return key is None or self._latest.get(key) == job_id
+
+    def _set_busy(self, busy: bool) -> None:
+        if busy != self.busy:
+            self.busy = busy
+            if self.on_busy is not None:
+                self.on_busy(busy)
+
+    def _run(self) -> None:
+        while True:
+            key, job_id, func, on_done, on_error = self._jobs.get()
+            result, error = None, None
+            if self.is_current(key, job_id):
+                try:
+                    result = func()
+                except Exception as e:
+                    error = e
+            self._results.put((key, job_id, on_done, on_error, result, error))
+
+    def _poll(self) -> None:
+        try:
+            self._deliver()
+        finally:
+            self._set_busy(self._pending > 0)
+            self.window.after(self.poll_interval, self._poll)
+
+    def _deliver(self) -> None:
+        while True:
+            try:
+                key, job_id, on_done, on_error, result, error = self._results.get_nowait()
+            except queue.Empty:
+                return
+            self._pending -= 1
+            if not self.is_current(key, job_id):
+                continue
+            if error is not None:
+                handler = on_error or self.on_error
+                if handler is not None:
+                    handler(error)
+            elif on_done is not None:
+                on_done(result)
+
+
+class CancellableJob:
+    """Runs one call on its own thread so that it can be abandoned.
+
+    The call should check ``cancelled`` and report how far it got with
+    ``report``. Progress, completion and errors are delivered on the Tk
+    thread; once the job is cancelled or has timed out nothing more is
+    delivered, even if the call returns later.
+    """
+
+    def __init__(
+        self,
+        window,
+        on_done: Callable[[Any], None],
+        on_error: Callable[[Exception], None],
+        on_progress: Optional[Callable[[float, int], None]] = None,
+        timeout: Optional[float] = None,
+        poll_interval: int = 100,
+    ) -> None:
+        self.window = window
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.cancelled = threading.Event()
+        self.rows = 0
+        self._result: "queue.Queue[tuple]" = queue.Queue()
+        self._start = 0.0
+
+    def start(self, func: Callable[[], Any]) -> "CancellableJob":
+        def run() -> None:
+            try:
+                self._result.put((func(), None))
+            except Exception as e:
+                self._result.put((None, e))
+
+        self._start = time.monotonic()
+        threading.Thread(target=run, daemon=True).start()
+        self.window.after(self.poll_interval, self._poll)
+        return self
+
+    def report(self, rows: int) -> None:
+        self.rows = rows
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self._start
+
+    def _poll(self) -> None:
+        if self.cancelled.is_set():
+            return
+        try:
+            result, error = self._result.get_nowait()
+        except queue.Empty:
+            if self.timeout is not None and self.elapsed > self.timeout:
+                self.cancel()
+                self.on_error(TimeoutError(f"Query timed out after {self.timeout:g} s."))
+                return
+            if self.on_progress is not None:
+                self.on_progress(self.elapsed, self.rows)
+            self.window.after(self.poll_interval, self._poll)
+            return
+        if error is not None:
+            self.on_error(error)
+        else:
+            self.on_done(result)